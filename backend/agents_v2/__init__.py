@@ -1,12 +1,7 @@
 """Pydantic AI-based agents for enhanced code analysis and editing."""
 
-from .base_agent import BaseCodeAgent
-from .code_analyzer_agent import CodeAnalyzerAgent
-from .security_agent import SecurityAnalysisAgent
-from .performance_agent import PerformanceAnalysisAgent
-from .fix_agent import CodeFixAgent
-from .editor_agent import CodeEditorAgent
-from .orchestrator import AgentOrchestrator
+import importlib
+
 from .models import (
     CodeIssue,
     CodeRecommendation,
@@ -16,8 +11,36 @@ from .models import (
     CodeContext
 )
 
+# Agent classes pull in pydantic_ai and openai, so they are imported on
+# first access (PEP 562) rather than when the package is imported
+_LAZY = {
+    'BaseCodeAgent': '.base_agent',
+    'get_agent': '.base_agent',
+    'CodeAnalyzerAgent': '.code_analyzer_agent',
+    'SecurityAnalysisAgent': '.security_agent',
+    'PerformanceAnalysisAgent': '.performance_agent',
+    'CodeFixAgent': '.fix_agent',
+    'CodeEditorAgent': '.editor_agent',
+    'AgentOrchestrator': '.orchestrator',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        obj = getattr(module, name)
+        globals()[name] = obj
+        return obj
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
+
+
 __all__ = [
     'BaseCodeAgent',
+    'get_agent',
     'CodeAnalyzerAgent',
     'SecurityAnalysisAgent',
     'PerformanceAnalysisAgent',
@@ -30,4 +53,4 @@ __all__ = [
     'ValidationResult',
     'AnalysisResult',
     'CodeContext'
-]
\ No newline at end of file
+]
@@ -1,21 +1,32 @@
 """Base Pydantic AI agent for code analysis and editing."""
 
 import os
+import re
+import uuid
+import ast
+import time
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+import functools
 from datetime import datetime
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TypeVar, Generic
 from pydantic import BaseModel
-from pydantic_ai import Agent, Tool, RunContext
+from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIChatModel
-from pydantic_ai.models import KnownModelName
 from pydantic_ai.providers.openai import OpenAIProvider
 from openai import AsyncAzureOpenAI
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 from .models import (
     CodeContext,
     CodeIssue,
     CodeRecommendation,
-    EditOperation,
     ValidationResult,
     AgentResponse
 )
@@ -24,10 +35,319 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=BaseModel)
 
+# Precompiled patterns shared by the base tools
+_FUNC_DEF_RE = re.compile(r'def\s+(\w+)\s*\(')
+_COMPLEXITY_RE = re.compile(r'(?:^|\s)(?:if|elif|for|while|except|case)(?=\s)')
+
+# Inputs at least this large use the Hyperscan DFA when it is installed
+_HYPERSCAN_MIN_BYTES = 64 * 1024
+_COMPLEXITY_KEYWORDS = (b'if', b'elif', b'for', b'while', b'except', b'case')
+
+# AST nodes that add a decision point to cyclomatic complexity
+_DECISION_NODES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+    ast.With, ast.AsyncWith, ast.BoolOp, ast.match_case
+)
+
+# Analysis results memoized by agent, model, file and code content (LRU-bounded)
+_ANALYSIS_CACHE: "OrderedDict[str, AgentResponse]" = OrderedDict()
+_ANALYSIS_CACHE_SIZE = int(os.getenv("AGENT_ANALYSIS_CACHE_SIZE", "256"))
+
+# Invariant header of every fix prompt. Kept first and verbatim so the
+# provider's prompt-prefix cache can reuse it across calls.
+_FIX_PROMPT_PREFIX = """Generate a fix for a code issue.
+Provide a safe, tested fix that resolves the issue.
+
+---
+"""
+
+# Shared limit for validation checkers (syntax, semantic, type checks)
+_VALIDATION_SEMAPHORE = asyncio.Semaphore(int(os.getenv("AGENT_VALIDATION_CONCURRENCY", "4")))
+
+
+class _TokenBucketLimiter:
+    """Paces model calls to the deployment's requests and tokens per minute.
+    
+    Each quota is a token bucket refilled continuously over a minute; a
+    quota of 0 is unlimited. Callers are admitted in arrival order.
+    """
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+    
+    async def acquire(self, tokens: int):
+        """Wait until one request of about `tokens` tokens fits both quotas.
+        
+        Args:
+            tokens: Estimated prompt tokens of the request
+        """
+        if not (self.rpm or self.tpm):
+            return
+        
+        # A request larger than the whole minute's budget waits for a full bucket
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+
+
+# Rate limit shared by every agent calling the Azure deployment (0 = unlimited)
+_MODEL_LIMITER = _TokenBucketLimiter(
+    rpm=int(os.getenv("AZURE_OPENAI_RPM", "0")),
+    tpm=int(os.getenv("AZURE_OPENAI_TPM", "0"))
+)
+
+
+def issue_ids(batch_size: int = 64):
+    """Yield random (version 4) UUID strings for new issues.
+    
+    Randomness is read from os.urandom once per batch instead of once per
+    id, which matters when an analysis emits many issues.
+    
+    Args:
+        batch_size: Number of ids drawn per os.urandom call
+        
+    Yields:
+        UUID strings
+    """
+    while True:
+        raw = os.urandom(16 * batch_size)
+        for offset in range(0, len(raw), 16):
+            yield str(uuid.UUID(bytes=raw[offset:offset + 16], version=4))
+
+
+_issue_ids = issue_ids()
+
+
+def reissue_issues(issues: List[CodeIssue]) -> List[CodeIssue]:
+    """Copy previously detected issues as new ones of the current analysis.
+    
+    Cache hits serve copies with a fresh id and detection time, so separate
+    analyses never share issue ids.
+    
+    Args:
+        issues: Issues from a cached analysis
+        
+    Returns:
+        Copies of the issues, in the same order
+    """
+    detected_at = datetime.now()
+    return [
+        issue.model_copy(update={"id": next(_issue_ids), "detected_at": detected_at})
+        for issue in issues
+    ]
+
+
+# Keywords the fix agent dispatches on, looked for in issue titles
+_FIX_TAG_KEYWORDS = ("sql", "naming", "loop", "exception")
+
+
+def issue_tags(title: str, description: str = "") -> frozenset:
+    """Return the fix dispatch tags for an issue.
+    
+    Tags are the fix keywords found in the lowercased title, plus "snake"
+    when the description asks for snake_case names.
+    
+    Args:
+        title: Issue title
+        description: Issue description
+        
+    Returns:
+        Frozen set of tags
+    """
+    title = title.lower()
+    tags = [keyword for keyword in _FIX_TAG_KEYWORDS if keyword in title]
+    if "snake" in description.lower():
+        tags.append("snake")
+    return frozenset(tags)
+
+
+@functools.lru_cache(maxsize=1)
+def _fallback_provider() -> OpenAIProvider:
+    """Return the OpenAI provider shared by agents without an Azure client.
+    
+    Credentials are read from OPENAI_API_KEY; the environment is never
+    modified, and every fallback agent reuses the same client.
+    """
+    return OpenAIProvider()
+
+
+@functools.lru_cache(maxsize=128)
+def _build_default_prompt(name: str, description: str) -> str:
+    """Build the default system prompt for an agent.
+    
+    Cached so every instance of an agent reuses the identical prompt string.
+    
+    Args:
+        name: Agent name
+        description: Agent description
+        
+    Returns:
+        System prompt text
+    """
+    return f"""You are {name}, an expert AI agent specialized in code analysis and improvement.
+        
+Description: {description}
+
+Your responsibilities:
+1. Analyze code for issues and improvements
+2. Provide actionable recommendations
+3. Generate safe and tested fixes
+4. Explain your reasoning clearly
+5. Consider best practices and standards
+
+Always provide structured, type-safe responses."""
+
+
+
+@functools.lru_cache(maxsize=128)
+def _analyze_python_ast(code: str) -> Optional[Tuple[Tuple[str, ...], int]]:
+    """Extract function names and cyclomatic complexity in one AST walk.
+    
+    Args:
+        code: Python source code
+        
+    Returns:
+        Tuple of (function names, complexity), or None if the code does not parse
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    
+    functions = []
+    complexity = 1
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions.append(node.name)
+        elif isinstance(node, _DECISION_NODES):
+            complexity += 1
+    
+    return tuple(functions), complexity
+
+
+@functools.lru_cache(maxsize=1)
+def _complexity_hyperscan_db():
+    """Compile the complexity keywords into a Hyperscan database (once)."""
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[rb'(?:^|\s)' + keyword + rb'\s' for keyword in _COMPLEXITY_KEYWORDS],
+        ids=list(range(len(_COMPLEXITY_KEYWORDS))),
+        elements=len(_COMPLEXITY_KEYWORDS),
+        flags=[0] * len(_COMPLEXITY_KEYWORDS)
+    )
+    return db
+
+
+def _count_keywords_hyperscan(code: str) -> int:
+    """Count complexity keywords with a single SIMD Hyperscan pass.
+    
+    Args:
+        code: Source code
+        
+    Returns:
+        Number of decision keywords found
+    """
+    matches = [0]
+    
+    def on_match(id, start, end, flags, context):
+        matches[0] += 1
+    
+    _complexity_hyperscan_db().scan(code.encode(), match_event_handler=on_match)
+    return matches[0]
+
+# Base tools are module-level coroutines shared by every agent instance
+async def analyze_syntax(ctx: RunContext[Any], code: str, language: str) -> Dict[str, Any]:
+    """Analyze code syntax.
+
+    Args:
+        ctx: Run context
+        code: Code to analyze
+        language: Programming language
+
+    Returns:
+        Syntax analysis results
+    """
+    return {
+        "valid": True,
+        "language": language,
+        "lines": code.count('\n') + 1
+    }
+
+
+async def extract_functions(ctx: RunContext[Any], code: str) -> List[str]:
+    """Extract function definitions from code.
+
+    Args:
+        ctx: Run context
+        code: Code to analyze
+
+    Returns:
+        List of function names
+    """
+    parsed = _analyze_python_ast(code)
+    if parsed is not None:
+        return list(parsed[0])
+    
+    # Not parseable as Python: fall back to a simple regex
+    return _FUNC_DEF_RE.findall(code)
+
+
+async def count_complexity(ctx: RunContext[Any], code: str) -> int:
+    """Calculate cyclomatic complexity estimate.
+
+    Args:
+        ctx: Run context
+        code: Code to analyze
+
+    Returns:
+        Complexity score
+    """
+    parsed = _analyze_python_ast(code)
+    if parsed is not None:
+        return parsed[1]
+    
+    # Not parseable as Python: base complexity plus one per decision
+    # keyword, counted in a single pass over the code
+    if HYPERSCAN_AVAILABLE and len(code) >= _HYPERSCAN_MIN_BYTES:
+        return 1 + _count_keywords_hyperscan(code)
+    return 1 + len(_COMPLEXITY_RE.findall(code))
+
 
 class BaseCodeAgent(Generic[T]):
     """Base class for all code analysis agents using Pydantic AI."""
     
+    # Tools registered on every agent
+    BASE_TOOLS = (analyze_syntax, extract_functions, count_complexity)
+    
     def __init__(
         self,
         name: str,
@@ -57,11 +377,11 @@ class BaseCodeAgent(Generic[T]):
                 self.model_name,
                 provider=OpenAIProvider(openai_client=async_azure_client)
             )
-            logger.info(f"[{self.name}] Initialized with AsyncAzureOpenAI - Model: {self.model_name}")
+            logger.info("[%s] Initialized with AsyncAzureOpenAI - Model: %s", self.name, self.model_name)
         else:
             # Fallback to default model (requires OPENAI_API_KEY)
-            self.model = 'openai:gpt-4'
-            logger.warning(f"[{self.name}] No Azure client provided, using fallback")
+            self.model = OpenAIChatModel('gpt-4', provider=_fallback_provider())
+            logger.warning("[%s] No Azure client provided, using fallback", self.name)
             
         # Create the agent with tools
         self.agent = self._create_agent(system_prompt)
@@ -78,84 +398,28 @@ class BaseCodeAgent(Generic[T]):
         Returns:
             Configured Pydantic AI agent
         """
-        default_prompt = f"""You are {self.name}, an expert AI agent specialized in code analysis and improvement.
+        system_prompt = system_prompt or _build_default_prompt(self.name, self.description)
+        # Tokens the system prompt adds to every call (about 4 chars each)
+        self._system_prompt_tokens = len(system_prompt) // 4
         
-Description: {self.description}
-
-Your responsibilities:
-1. Analyze code for issues and improvements
-2. Provide actionable recommendations
-3. Generate safe and tested fixes
-4. Explain your reasoning clearly
-5. Consider best practices and standards
-
-Always provide structured, type-safe responses."""
-
         return Agent(
             model=self.model,
-            system_prompt=system_prompt or default_prompt
+            system_prompt=system_prompt
         )
     
+    async def _throttle(self, prompt: str):
+        """Wait for the shared rate limit before sending a prompt to the model.
+        
+        Args:
+            prompt: User prompt about to be sent
+        """
+        await _MODEL_LIMITER.acquire(len(prompt) // 4 + self._system_prompt_tokens)
+    
     def _register_tools(self):
         """Register agent-specific tools. Override in subclasses."""
         # Base tools that all agents share
-        
-        @self.agent.tool
-        async def analyze_syntax(ctx: RunContext[Any], code: str, language: str) -> Dict[str, Any]:
-            """Analyze code syntax.
-            
-            Args:
-                ctx: Run context
-                code: Code to analyze
-                language: Programming language
-                
-            Returns:
-                Syntax analysis results
-            """
-            return {
-                "valid": True,
-                "language": language,
-                "lines": len(code.split('\n'))
-            }
-        
-        @self.agent.tool
-        async def extract_functions(ctx: RunContext[Any], code: str) -> List[str]:
-            """Extract function definitions from code.
-            
-            Args:
-                ctx: Run context
-                code: Code to analyze
-                
-            Returns:
-                List of function names
-            """
-            import re
-            # Simple regex for function extraction (Python)
-            pattern = r'def\s+(\w+)\s*\('
-            functions = re.findall(pattern, code)
-            return functions
-        
-        @self.agent.tool
-        async def count_complexity(ctx: RunContext[Any], code: str) -> int:
-            """Calculate cyclomatic complexity estimate.
-            
-            Args:
-                ctx: Run context
-                code: Code to analyze
-                
-            Returns:
-                Complexity score
-            """
-            # Simplified complexity calculation
-            complexity = 1  # Base complexity
-            
-            # Count decision points
-            keywords = ['if', 'elif', 'for', 'while', 'except', 'case']
-            for keyword in keywords:
-                complexity += code.count(f' {keyword} ')
-                complexity += code.count(f'\n{keyword} ')
-                
-            return complexity
+        for tool in self.BASE_TOOLS:
+            self.agent.tool(tool)
     
     async def analyze(self, context: CodeContext) -> AgentResponse:
         """Analyze code and return results.
@@ -166,18 +430,30 @@ Always provide structured, type-safe responses."""
         Returns:
             Agent response with analysis results
         """
-        start_time = datetime.now()
-        logger.info(f"[AGENT:{self.name}] Starting analysis...")
+        start_time = time.perf_counter()
+        
+        cache_key = self._analysis_cache_key(context)
+        cached = _ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(cache_key)
+            logger.info("[AGENT:%s] ⚡ Cache hit - reusing previous analysis", self.name)
+            # Reissue the cached findings as new issues of this analysis
+            return cached.model_copy(update={
+                "data": reissue_issues(cached.data),
+                "processing_time": time.perf_counter() - start_time
+            })
+        
+        logger.info("[AGENT:%s] Starting analysis...", self.name)
         
         try:
             # Run agent analysis
             result = await self._perform_analysis(context)
             
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             issue_count = len(result) if isinstance(result, list) else 0
-            logger.info(f"[AGENT:{self.name}] ✅ Completed in {processing_time*1000:.2f}ms - found {issue_count} issues")
+            logger.info("[AGENT:%s] ✅ Completed in %.2fms - found %d issues", self.name, processing_time * 1000, issue_count)
             
-            return AgentResponse(
+            response = AgentResponse(
                 agent_name=self.name,
                 success=True,
                 data=result,
@@ -185,9 +461,18 @@ Always provide structured, type-safe responses."""
                 metadata={"language": context.language}
             )
             
+            # Model failures raise, so any issue list, even an empty one for
+            # clean code, is safe to reuse
+            if isinstance(result, list):
+                _ANALYSIS_CACHE[cache_key] = response
+                if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+                    _ANALYSIS_CACHE.popitem(last=False)
+            
+            return response
+            
         except Exception as e:
-            processing_time = (datetime.now() - start_time).total_seconds()
-            logger.error(f"[AGENT:{self.name}] ❌ Failed after {processing_time*1000:.2f}ms: {e}")
+            processing_time = time.perf_counter() - start_time
+            logger.error("[AGENT:%s] ❌ Failed after %.2fms: %s", self.name, processing_time * 1000, e)
             
             return AgentResponse(
                 agent_name=self.name,
@@ -196,6 +481,30 @@ Always provide structured, type-safe responses."""
                 processing_time=processing_time
             )
     
+    async def analyze_stream(self, context: CodeContext) -> AsyncIterator[CodeIssue]:
+        """Analyze code and yield issues as they are found.
+        
+        Args:
+            context: Code context to analyze
+            
+        Yields:
+            Detected issues
+        """
+        logger.info("[AGENT:%s] Starting streaming analysis...", self.name)
+        async for issue in self._stream_analysis(context):
+            yield issue
+    
+    def _analysis_cache_key(self, context: CodeContext) -> str:
+        """Build the memoization key for an analysis.
+        
+        Args:
+            context: Code context to analyze
+            
+        Returns:
+            Key of agent, model, file path, language and the code's digest
+        """
+        return f"{self.name}|{self.model_name}|{context.file_path}|{context.language}|{context.code_digest}"
+    
     async def _perform_analysis(self, context: CodeContext) -> Any:
         """Perform the actual analysis. Override in subclasses.
         
@@ -207,6 +516,21 @@ Always provide structured, type-safe responses."""
         """
         raise NotImplementedError("Subclasses must implement _perform_analysis")
     
+    async def _stream_analysis(self, context: CodeContext) -> AsyncIterator[CodeIssue]:
+        """Yield issues incrementally. Override in subclasses that can stream.
+        
+        The default implementation yields the result of _perform_analysis.
+        
+        Args:
+            context: Code context to analyze
+            
+        Yields:
+            Detected issues
+        """
+        result = await self._perform_analysis(context)
+        for issue in result if isinstance(result, list) else []:
+            yield issue
+    
     async def generate_recommendation(
         self,
         issue: CodeIssue,
@@ -223,18 +547,7 @@ Always provide structured, type-safe responses."""
         """
         try:
             # Use agent to generate fix
-            prompt = f"""Generate a fix for this issue:
-            
-Issue: {issue.title}
-Description: {issue.description}
-Severity: {issue.severity}
-
-Code context:
-```{context.language}
-{context.code}
-```
-
-Provide a safe, tested fix that resolves the issue."""
+            prompt = self._build_fix_prompt(issue, context)
             
             # This would use the agent's completion
             # For now, return a mock recommendation
@@ -252,9 +565,111 @@ Provide a safe, tested fix that resolves the issue."""
             )
             
         except Exception as e:
-            logger.error(f"Failed to generate recommendation: {e}")
+            logger.error("Failed to generate recommendation: %s", e)
             return None
     
+    async def stream_recommendation(
+        self,
+        issue: CodeIssue,
+        context: CodeContext
+    ) -> AsyncIterator[CodeRecommendation]:
+        """Stream a fix recommendation from the model as it is generated.
+        
+        Yields partially validated recommendations while tokens arrive; the
+        last item yielded is the complete recommendation.
+        
+        Args:
+            issue: The issue to fix
+            context: Code context
+            
+        Yields:
+            Partial, then final, fix recommendations
+        """
+        prompt = self._build_fix_prompt(issue, context)
+        await self._throttle(prompt)
+        
+        async with self.agent.run_stream(prompt, output_type=CodeRecommendation) as stream:
+            async for partial in stream.stream_output():
+                yield partial
+    
+    def _build_fix_prompt(self, issue: CodeIssue, context: CodeContext) -> str:
+        """Build the prompt asking the model to fix an issue.
+        
+        Args:
+            issue: The issue to fix
+            context: Code context
+            
+        Returns:
+            Prompt text
+        """
+        return _FIX_PROMPT_PREFIX + f"""Issue ID: {issue.id}
+Issue: {issue.title}
+Description: {issue.description}
+Severity: {issue.severity}
+
+Code context:
+```{context.language}
+{context.code}
+```"""
+    
+    async def generate_recommendations_batch(
+        self,
+        issues: List[CodeIssue],
+        context: CodeContext
+    ) -> List[Optional[CodeRecommendation]]:
+        """Generate fix recommendations for many issues concurrently.
+        
+        Concurrency is bounded by the AGENT_BATCH_CONCURRENCY environment
+        variable (default 16) to avoid rate-limit storms.
+        
+        Args:
+            issues: Issues to fix
+            context: Code context
+            
+        Returns:
+            Recommendations in the same order as issues (None where no fix)
+        """
+        recommendations: List[Optional[CodeRecommendation]] = [None] * len(issues)
+        async for index, recommendation in self.iter_recommendations(issues, context):
+            recommendations[index] = recommendation
+        return recommendations
+    
+    async def iter_recommendations(
+        self,
+        issues: List[CodeIssue],
+        context: CodeContext
+    ) -> AsyncIterator[Tuple[int, Optional[CodeRecommendation]]]:
+        """Generate fix recommendations concurrently, yielding each when ready.
+        
+        Concurrency is bounded by the AGENT_BATCH_CONCURRENCY environment
+        variable (default 16). Results arrive in completion order, tagged
+        with the index of their issue.
+        
+        Args:
+            issues: Issues to fix
+            context: Code context
+            
+        Yields:
+            Tuples of (issue index, recommendation or None)
+        """
+        semaphore = asyncio.Semaphore(int(os.getenv("AGENT_BATCH_CONCURRENCY", "16")))
+        
+        async def _generate(index: int, issue: CodeIssue) -> Tuple[int, Optional[CodeRecommendation]]:
+            async with semaphore:
+                try:
+                    return index, await self.generate_recommendation(issue, context)
+                except Exception as e:
+                    logger.error("Failed to generate recommendation for issue %s: %s", issue.id, e)
+                    return index, None
+        
+        tasks = [asyncio.create_task(_generate(index, issue)) for index, issue in enumerate(issues)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
     async def validate_fix(
         self,
         original_code: str,
@@ -284,23 +699,77 @@ Provide a safe, tested fix that resolves the issue."""
             if fixed_code == original_code:
                 warnings.append("No changes detected in fix")
             
-            # More validation can be added here
+            # Independent checkers run concurrently
+            async with asyncio.TaskGroup() as tg:
+                syntax_task = tg.create_task(self._run_check(self._check_syntax, fixed_code, language))
+                semantic_task = tg.create_task(self._run_check(self._check_semantic, fixed_code, language))
+                types_task = tg.create_task(self._run_check(self._check_types, fixed_code, language))
             
             return ValidationResult(
                 valid=len(errors) == 0,
-                syntax_valid=True,  # Would use actual syntax checker
-                semantic_valid=True,  # Would use semantic analysis
-                type_check_passed=True,  # Would use type checker
+                syntax_valid=syntax_task.result(),
+                semantic_valid=semantic_task.result(),
+                type_check_passed=types_task.result(),
                 errors=errors,
                 warnings=warnings,
                 metrics={
-                    "lines_changed": abs(len(fixed_code.split('\n')) - len(original_code.split('\n')))
+                    "lines_changed": abs(fixed_code.count('\n') - original_code.count('\n'))
                 }
             )
             
         except Exception as e:
-            logger.error(f"Validation failed: {e}")
+            logger.error("Validation failed: %s", e)
             return ValidationResult(
                 valid=False,
                 errors=[str(e)]
-            )
\ No newline at end of file
+            )
+    
+    async def _run_check(self, check, code: str, language: str) -> bool:
+        """Run a validation checker under the shared concurrency limit.
+        
+        Args:
+            check: Checker coroutine function
+            code: Code to check
+            language: Programming language
+            
+        Returns:
+            Checker result
+        """
+        async with _VALIDATION_SEMAPHORE:
+            return await check(code, language)
+    
+    async def _check_syntax(self, code: str, language: str) -> bool:
+        """Check syntax validity. Placeholder until a syntax checker is wired in."""
+        return True
+    
+    async def _check_semantic(self, code: str, language: str) -> bool:
+        """Check semantic validity. Placeholder until semantic analysis is wired in."""
+        return True
+    
+    async def _check_types(self, code: str, language: str) -> bool:
+        """Run type checking. Placeholder until a type checker is wired in."""
+        return True
+
+
+# Agents are expensive to build (model, tools, prompt), so each
+# (class, client, model) combination is constructed once and reused
+_AGENT_POOL: Dict[Tuple[type, int, Optional[str]], BaseCodeAgent] = {}
+
+
+def get_agent(cls, async_azure_client: Optional[AsyncAzureOpenAI] = None, model_name: Optional[str] = None):
+    """Return a pooled agent instance, creating it on first use.
+    
+    Args:
+        cls: BaseCodeAgent subclass to instantiate
+        async_azure_client: Async Azure OpenAI client (optional)
+        model_name: Model deployment name
+        
+    Returns:
+        Shared agent instance
+    """
+    key = (cls, id(async_azure_client), model_name)
+    agent = _AGENT_POOL.get(key)
+    if agent is None:
+        agent = cls(async_azure_client, model_name)
+        _AGENT_POOL[key] = agent
+    return agent
@@ -1,11 +1,11 @@
 """Code quality analysis agent using Pydantic AI."""
 
 import re
-import uuid
-from typing import List, Dict, Any
+import functools
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
-from .base_agent import BaseCodeAgent
+from .base_agent import BaseCodeAgent, issue_ids, issue_tags
 from pydantic_ai import RunContext
 from .models import (
     CodeContext,
@@ -15,6 +15,245 @@ from .models import (
     IssueCategory
 )
 
+# Precompiled patterns shared by the analysis tools
+# One alternation for the three Python naming rules, matched over the whole
+# file at once; [^\S\n] keeps every match on a single line
+_NAMING = re.compile(
+    r'(?P<const>^[^\S\n]*(?P<vn>[A-Z_]+)[^\S\n]*=)'
+    r'|def[^\S\n]+(?P<fn>[a-z][a-zA-Z]+)\('
+    r'|class[^\S\n]+(?P<cn>[a-z][a-z_]*)[^\S\n]*[\(:]',
+    re.MULTILINE
+)
+# Counting patterns run over the whole file; [^\S\n] keeps matches on one line
+_DEF_ANY = re.compile(r'def[^\S\n]+(\w+)[^\S\n]*\(')
+_CLASS_ANY = re.compile(r'class[^\S\n]+\w+')
+_IMPORT = re.compile(r'^import[^\S\n]+|^from[^\S\n].*import', re.MULTILINE)
+# Complexity keywords are counted as whole words. Bytes that cannot be part of
+# an ASCII word are mapped to spaces, so bytes.split() yields the words
+_KEYWORDS = re.compile(r'\b(?:if|elif|else|for|while|except|with)\b')
+_COMPLEXITY_KEYWORDS = frozenset({b'if', b'elif', b'else', b'for', b'while', b'except', b'with'})
+_WORD_BYTES = bytes(
+    b if chr(b).isalnum() or b == ord('_') or b >= 0x80 else ord(' ')
+    for b in range(256)
+)
+
+# Odd multipliers for combining four line hashes into a block fingerprint
+_FP_P1 = 0x100000001B3
+_FP_P2 = 0x9E3779B97F4A7C15
+_FP_P3 = 0xC2B2AE3D27D4EB4F
+_FP_MASK = (1 << 64) - 1
+
+# Severity strings used by the analysis tools, resolved without Enum lookups
+_SEVERITY = {level.value: level for level in SeverityLevel}
+
+# Issue ids for every analysis, drawing randomness in shared batches
+_issue_ids = issue_ids()
+
+# Bounds on duplicate-block detection for generated or minified code
+_DUPLICATE_SCAN_MAX_CHARS = 500_000
+_DUPLICATE_MAX_LINE_LEN = 1024
+_MAX_DUPLICATE_REPORTS = 50
+
+
+def _count_keywords(code: str) -> int:
+    """Count complexity keywords, matching \\b(?:if|...)\\b word for word.
+    
+    Args:
+        code: Code to analyze
+        
+    Returns:
+        Number of keyword occurrences
+    """
+    words = code.encode('utf-8').translate(_WORD_BYTES).split()
+    count = sum(map(_COMPLEXITY_KEYWORDS.__contains__, words))
+    if not code.isascii():
+        # Non-ASCII characters stay glued to neighbouring words; recount
+        # those words with the regex, which knows which of them are \\w
+        count += sum(
+            len(_KEYWORDS.findall(word.decode('utf-8')))
+            for word in words if not word.isascii()
+        )
+    return count
+
+
+@functools.lru_cache(maxsize=128)
+def _scan_naming(code: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Check Python naming conventions with one regex sweep over the file.
+    
+    Cached by content like _scan_code; callers must not mutate the returned
+    lists.
+    
+    Args:
+        code: Code to analyze
+        
+    Returns:
+        Tuple of (function/class naming issues, constant placement issues)
+    """
+    # line -> [function name, class name, constant name], first match wins
+    hits = {}
+    line_num = 1
+    position = 0
+    for match in _NAMING.finditer(code):
+        start = match.start()
+        line_num += code.count('\n', position, start)
+        position = start
+        names = hits.setdefault(line_num, [None, None, None])
+        if match.group('const'):
+            names[2] = match.group('vn')
+        elif match.group('fn'):
+            names[0] = names[0] or match.group('fn')
+        else:
+            names[1] = names[1] or match.group('cn')
+    
+    naming = []
+    constants = []
+    for line_num, (func_name, class_name, const_name) in hits.items():
+        if func_name:
+            naming.append({
+                "line": line_num,
+                "issue": f"Function '{func_name}' should use snake_case",
+                "severity": "low"
+            })
+        if class_name:
+            naming.append({
+                "line": line_num,
+                "issue": f"Class '{class_name}' should use PascalCase",
+                "severity": "medium"
+            })
+        if const_name and line_num > 10:  # Skip early constants
+            constants.append({
+                "line": line_num,
+                "issue": f"Variable '{const_name}' appears to be a constant, consider moving to module level",
+                "severity": "low"
+            })
+    return naming, constants
+
+
+@functools.lru_cache(maxsize=128)
+def _scan_code(code: str) -> Dict[str, Any]:
+    """Collect code smells and metrics in one pass over the lines.
+    
+    Results are cached by content alone, so re-analyzing unchanged code (e.g.
+    after each recommendation in an edit session) is free whichever tool asks
+    first. Naming checks depend on the language and live in _scan_naming.
+    Callers must not mutate the returned structures.
+    
+    Args:
+        code: Code to analyze
+        
+    Returns:
+        Dict with "smells" and "metrics" entries in the formats returned by
+        the analysis tools
+    """
+    long_functions = []
+    duplicates = []
+    deep_nesting = []
+    
+    # split('\n') rather than splitlines(): the metrics count the empty line
+    # after a trailing newline, and \r or \f must not start a new line
+    lines = code.split('\n')
+    total_lines = len(lines)
+    line_lens = list(map(len, lines))
+    
+    # Whole-file counts, so the per-line loops below stay small
+    classes = len(_CLASS_ANY.findall(code))
+    imports = len(_IMPORT.findall(code))
+    
+    # Function boundaries (long functions) and counts
+    functions = 0
+    in_function = False
+    function_start = 0
+    function_name = ""
+    line_num = 1
+    position = 0
+    for match in _DEF_ANY.finditer(code):
+        start = match.start()
+        line_num += code.count('\n', position, start)
+        position = start
+        functions += 1
+        if line_num == function_start:
+            continue  # Only the first definition on a line starts a function
+        if in_function and line_num - function_start > 50:
+            long_functions.append({
+                "type": "long_function",
+                "function": function_name,
+                "lines": line_num - function_start,
+                "severity": "medium"
+            })
+        in_function = True
+        function_start = line_num
+        function_name = match.group(1)
+    
+    # Line kind counts and deeply nested code
+    code_lines = comment_lines = blank_lines = 0
+    for line_num, (line_len, lstripped) in enumerate(zip(line_lens, map(str.lstrip, lines)), 1):
+        if not lstripped:
+            blank_lines += 1
+        elif lstripped[0] == '#':
+            comment_lines += 1
+        else:
+            code_lines += 1
+        if line_len - len(lstripped) > 16:  # More than 4 levels of indentation
+            deep_nesting.append({
+                "type": "deep_nesting",
+                "line": line_num,
+                "severity": "medium"
+            })
+    
+    # Duplicate 4-line blocks, fingerprinted from per-line hashes. Skipped for
+    # very large inputs, and windows holding a giant (minified) line are ignored
+    if len(code) <= _DUPLICATE_SCAN_MAX_CHARS:
+        line_hashes = list(map(hash, lines))
+        block_starts = {}
+        window_len = sum(line_lens[:3])
+        long_lines = sum(n > _DUPLICATE_MAX_LINE_LEN for n in line_lens[:3])
+        for start in range(total_lines - 3):
+            entering = line_lens[start + 3]
+            window_len += entering
+            long_lines += entering > _DUPLICATE_MAX_LINE_LEN
+            if start:
+                leaving = line_lens[start - 1]
+                window_len -= leaving
+                long_lines -= leaving > _DUPLICATE_MAX_LINE_LEN
+            # Joined block length includes the three newlines
+            if window_len + 3 <= 50 or long_lines:  # Only consider substantial blocks
+                continue
+            h0, h1, h2, h3 = line_hashes[start:start + 4]
+            fingerprint = (h0 * _FP_P3 ^ h1 * _FP_P2 ^ h2 * _FP_P1 ^ h3) & _FP_MASK
+            first = block_starts.get(fingerprint)
+            if first is None:
+                block_starts[fingerprint] = start
+            elif line_hashes[first:first + 4] == line_hashes[start:start + 4]:
+                duplicates.append({
+                    "type": "duplicate_code",
+                    "lines": f"{first + 1} and {start + 1}",
+                    "severity": "medium"
+                })
+                if len(duplicates) >= _MAX_DUPLICATE_REPORTS:
+                    break
+    
+    complexity = 1 + _count_keywords(code)
+    if complexity < 10:
+        complexity_level = "simple"
+    elif complexity < 20:
+        complexity_level = "moderate"
+    else:
+        complexity_level = "complex"
+    
+    return {
+        "smells": long_functions + duplicates + deep_nesting,
+        "metrics": {
+            "total_lines": total_lines,
+            "code_lines": code_lines,
+            "comment_lines": comment_lines,
+            "blank_lines": blank_lines,
+            "functions": functions,
+            "classes": classes,
+            "imports": imports,
+            "complexity_score": complexity,
+            "complexity_level": complexity_level
+        }
+    }
 
 class CodeAnalyzerAgent(BaseCodeAgent):
     """Agent specialized in code quality analysis."""
@@ -43,43 +282,11 @@ class CodeAnalyzerAgent(BaseCodeAgent):
             Returns:
                 List of naming issues
             """
-            issues = []
-            lines = code.split('\n')
-            
-            for line_num, line in enumerate(lines, 1):
-                # Check for Python naming conventions
-                if language == "python":
-                    # Check for camelCase in function names (should be snake_case)
-                    if re.search(r'def\s+[a-z][a-zA-Z]+\(', line):
-                        func_match = re.search(r'def\s+([a-z][a-zA-Z]+)\(', line)
-                        if func_match:
-                            issues.append({
-                                "line": line_num,
-                                "issue": f"Function '{func_match.group(1)}' should use snake_case",
-                                "severity": "low"
-                            })
-                    
-                    # Check for lowercase class names (should be PascalCase)
-                    if re.search(r'class\s+[a-z][a-z_]*\s*[\(:]', line):
-                        class_match = re.search(r'class\s+([a-z][a-z_]*)\s*[\(:]', line)
-                        if class_match:
-                            issues.append({
-                                "line": line_num,
-                                "issue": f"Class '{class_match.group(1)}' should use PascalCase",
-                                "severity": "medium"
-                            })
-                    
-                    # Check for UPPERCASE variables that aren't constants
-                    if not line.strip().startswith('#') and '=' in line:
-                        var_match = re.search(r'^([A-Z_]+)\s*=', line.strip())
-                        if var_match and line_num > 10:  # Skip early constants
-                            issues.append({
-                                "line": line_num,
-                                "issue": f"Variable '{var_match.group(1)}' appears to be a constant, consider moving to module level",
-                                "severity": "low"
-                            })
-            
-            return issues
+            if language != "python":
+                return []
+            naming, constants = _scan_naming(code)
+            # Constant checks come after the other checks on the same line
+            return sorted(naming + constants, key=lambda issue: issue["line"])
         
         @self.agent.tool
         async def detect_code_smells(ctx: RunContext[Any], code: str) -> List[Dict[str, Any]]:
@@ -91,54 +298,7 @@ class CodeAnalyzerAgent(BaseCodeAgent):
             Returns:
                 List of code smells detected
             """
-            smells = []
-            lines = code.split('\n')
-            
-            # Check for long functions
-            in_function = False
-            function_start = 0
-            function_name = ""
-            
-            for line_num, line in enumerate(lines, 1):
-                if re.search(r'def\s+\w+\s*\(', line):
-                    if in_function and line_num - function_start > 50:
-                        smells.append({
-                            "type": "long_function",
-                            "function": function_name,
-                            "lines": line_num - function_start,
-                            "severity": "medium"
-                        })
-                    func_match = re.search(r'def\s+(\w+)\s*\(', line)
-                    if func_match:
-                        in_function = True
-                        function_start = line_num
-                        function_name = func_match.group(1)
-            
-            # Check for duplicate code patterns
-            code_blocks = {}
-            for i in range(len(lines) - 3):
-                block = '\n'.join(lines[i:i+4])
-                if len(block) > 50:  # Only consider substantial blocks
-                    if block in code_blocks:
-                        smells.append({
-                            "type": "duplicate_code",
-                            "lines": f"{code_blocks[block]} and {i+1}",
-                            "severity": "medium"
-                        })
-                    else:
-                        code_blocks[block] = i + 1
-            
-            # Check for deeply nested code
-            for line_num, line in enumerate(lines, 1):
-                indent_level = len(line) - len(line.lstrip())
-                if indent_level > 16:  # More than 4 levels of indentation
-                    smells.append({
-                        "type": "deep_nesting",
-                        "line": line_num,
-                        "severity": "medium"
-                    })
-            
-            return smells
+            return list(_scan_code(code)["smells"])
         
         @self.agent.tool
         async def analyze_complexity(ctx: RunContext[Any], code: str) -> Dict[str, Any]:
@@ -150,36 +310,7 @@ class CodeAnalyzerAgent(BaseCodeAgent):
             Returns:
                 Complexity metrics
             """
-            lines = code.split('\n')
-            
-            # Count various metrics
-            metrics = {
-                "total_lines": len(lines),
-                "code_lines": len([l for l in lines if l.strip() and not l.strip().startswith('#')]),
-                "comment_lines": len([l for l in lines if l.strip().startswith('#')]),
-                "blank_lines": len([l for l in lines if not l.strip()]),
-                "functions": len(re.findall(r'def\s+\w+\s*\(', code)),
-                "classes": len(re.findall(r'class\s+\w+', code)),
-                "imports": len(re.findall(r'^import\s+|^from\s+.*import', code, re.MULTILINE)),
-                "complexity_score": 0
-            }
-            
-            # Calculate complexity score
-            complexity = 1
-            for keyword in ['if', 'elif', 'else', 'for', 'while', 'except', 'with']:
-                complexity += len(re.findall(f'\\b{keyword}\\b', code))
-            
-            metrics["complexity_score"] = complexity
-            
-            # Determine complexity level
-            if complexity < 10:
-                metrics["complexity_level"] = "simple"
-            elif complexity < 20:
-                metrics["complexity_level"] = "moderate"
-            else:
-                metrics["complexity_level"] = "complex"
-            
-            return metrics
+            return dict(_scan_code(code)["metrics"])
     
     async def _perform_analysis(self, context: CodeContext) -> List[CodeIssue]:
         """Perform code quality analysis.
@@ -191,50 +322,42 @@ class CodeAnalyzerAgent(BaseCodeAgent):
             List of code quality issues
         """
         issues = []
+        file_path = context.file_path or "unknown"
+        detected_by = self.name
+        
+        def _make_issue(title, description, severity, category, confidence, line=None):
+            """Build a CodeIssue from trusted analyzer values."""
+            return CodeIssue.model_construct(
+                id=next(_issue_ids),
+                title=title,
+                description=description,
+                severity=_SEVERITY[severity],
+                category=category,
+                location=CodeLocation.model_construct(
+                    file_path=file_path,
+                    line_start=line,
+                    line_end=line
+                ) if line is not None else None,
+                confidence=confidence,
+                detected_by=detected_by,
+                tags=issue_tags(title, description)
+            )
         
         # Use fallback pattern-based analysis for now
         # (Pydantic AI agent.run() requires proper Azure model configuration)
-        lines = context.code.split('\n')
+        scan = _scan_code(context.code)
         
         # Check naming conventions directly
-        naming_issues = []
-        
-        # Python naming convention checks
-        if context.language == "python":
-            for line_num, line in enumerate(lines, 1):
-                # Check for camelCase in function names
-                if re.search(r'def\s+[a-z][a-zA-Z]+\(', line):
-                    func_match = re.search(r'def\s+([a-z][a-zA-Z]+)\(', line)
-                    if func_match:
-                        naming_issues.append({
-                            "line": line_num,
-                            "issue": f"Function '{func_match.group(1)}' should use snake_case",
-                            "severity": "low"
-                        })
-                # Check for lowercase class names
-                if re.search(r'class\s+[a-z][a-z_]*\s*[\(:]', line):
-                    class_match = re.search(r'class\s+([a-z][a-z_]*)\s*[\(:]', line)
-                    if class_match:
-                        naming_issues.append({
-                            "line": line_num,
-                            "issue": f"Class '{class_match.group(1)}' should use PascalCase",
-                            "severity": "medium"
-                        })
+        naming_issues = _scan_naming(context.code)[0] if context.language == "python" else []
         
         for issue_data in naming_issues:
-            issues.append(CodeIssue(
-                id=str(uuid.uuid4()),
-                title="Naming Convention Violation",
-                description=issue_data["issue"],
-                severity=SeverityLevel(issue_data["severity"]),
-                category=IssueCategory.STYLE,
-                location=CodeLocation(
-                    file_path=context.file_path or "unknown",
-                    line_start=issue_data["line"],
-                    line_end=issue_data["line"]
-                ),
-                confidence=0.9,
-                detected_by=self.name
+            issues.append(_make_issue(
+                "Naming Convention Violation",
+                issue_data["issue"],
+                issue_data["severity"],
+                IssueCategory.STYLE,
+                0.9,
+                line=issue_data["line"]
             ))
         
         # Detect code smells directly
@@ -242,84 +365,51 @@ class CodeAnalyzerAgent(BaseCodeAgent):
         
         for smell in code_smells:
             if smell["type"] == "long_function":
-                issues.append(CodeIssue(
-                    id=str(uuid.uuid4()),
-                    title="Long Function Detected",
-                    description=f"Function '{smell['function']}' is {smell['lines']} lines long. Consider breaking it into smaller functions.",
-                    severity=SeverityLevel(smell["severity"]),
-                    category=IssueCategory.MAINTAINABILITY,
-                    confidence=0.8,
-                    detected_by=self.name
+                issues.append(_make_issue(
+                    "Long Function Detected",
+                    f"Function '{smell['function']}' is {smell['lines']} lines long. Consider breaking it into smaller functions.",
+                    smell["severity"],
+                    IssueCategory.MAINTAINABILITY,
+                    0.8
                 ))
             elif smell["type"] == "duplicate_code":
-                issues.append(CodeIssue(
-                    id=str(uuid.uuid4()),
-                    title="Duplicate Code Detected",
-                    description=f"Similar code blocks found at lines {smell['lines']}. Consider extracting to a function.",
-                    severity=SeverityLevel(smell["severity"]),
-                    category=IssueCategory.MAINTAINABILITY,
-                    confidence=0.7,
-                    detected_by=self.name
+                issues.append(_make_issue(
+                    "Duplicate Code Detected",
+                    f"Similar code blocks found at lines {smell['lines']}. Consider extracting to a function.",
+                    smell["severity"],
+                    IssueCategory.MAINTAINABILITY,
+                    0.7
                 ))
             elif smell["type"] == "deep_nesting":
-                issues.append(CodeIssue(
-                    id=str(uuid.uuid4()),
-                    title="Deep Nesting",
-                    description=f"Deeply nested code at line {smell['line']}. Consider refactoring to reduce complexity.",
-                    severity=SeverityLevel(smell["severity"]),
-                    category=IssueCategory.QUALITY,
-                    location=CodeLocation(
-                        file_path=context.file_path or "unknown",
-                        line_start=smell["line"],
-                        line_end=smell["line"]
-                    ),
-                    confidence=0.85,
-                    detected_by=self.name
+                issues.append(_make_issue(
+                    "Deep Nesting",
+                    f"Deeply nested code at line {smell['line']}. Consider refactoring to reduce complexity.",
+                    smell["severity"],
+                    IssueCategory.QUALITY,
+                    0.85,
+                    line=smell["line"]
                 ))
         
         # Analyze complexity directly
-        complexity_metrics = {
-            "total_lines": len(lines),
-            "code_lines": len([l for l in lines if l.strip() and not l.strip().startswith('#')]),
-            "comment_lines": len([l for l in lines if l.strip().startswith('#')]),
-            "blank_lines": len([l for l in lines if not l.strip()]),
-            "functions": len(re.findall(r'def\s+\w+\s*\(', context.code)),
-            "classes": len(re.findall(r'class\s+\w+', context.code)),
-            "complexity_score": 1
-        }
-        
-        # Calculate complexity
-        for keyword in ['if', 'elif', 'else', 'for', 'while', 'except', 'with']:
-            complexity_metrics["complexity_score"] += len(re.findall(f'\\b{keyword}\\b', context.code))
-        
-        if complexity_metrics["complexity_score"] < 10:
-            complexity_metrics["complexity_level"] = "simple"
-        elif complexity_metrics["complexity_score"] < 20:
-            complexity_metrics["complexity_level"] = "moderate"
-        else:
-            complexity_metrics["complexity_level"] = "complex"
+        complexity_metrics = scan["metrics"]
         
         if complexity_metrics["complexity_level"] == "complex":
-            issues.append(CodeIssue(
-                id=str(uuid.uuid4()),
-                title="High Code Complexity",
-                description=f"Code has high cyclomatic complexity ({complexity_metrics['complexity_score']}). Consider simplifying logic.",
-                severity=SeverityLevel.MEDIUM,
-                category=IssueCategory.MAINTAINABILITY,
-                confidence=0.75,
-                detected_by=self.name
+            issues.append(_make_issue(
+                "High Code Complexity",
+                f"Code has high cyclomatic complexity ({complexity_metrics['complexity_score']}). Consider simplifying logic.",
+                "medium",
+                IssueCategory.MAINTAINABILITY,
+                0.75
             ))
         
         # Check for missing documentation
         if complexity_metrics["functions"] > 0 and complexity_metrics["comment_lines"] < complexity_metrics["functions"]:
-            issues.append(CodeIssue(
-                id=str(uuid.uuid4()),
-                title="Insufficient Documentation",
-                description=f"Found {complexity_metrics['functions']} functions but only {complexity_metrics['comment_lines']} comment lines. Add docstrings.",
-                severity=SeverityLevel.LOW,
-                category=IssueCategory.BEST_PRACTICES,
-                confidence=0.6,
-                detected_by=self.name
+            issues.append(_make_issue(
+                "Insufficient Documentation",
+                f"Found {complexity_metrics['functions']} functions but only {complexity_metrics['comment_lines']} comment lines. Add docstrings.",
+                "low",
+                IssueCategory.BEST_PRACTICES,
+                0.6
             ))
         
-        return issues
\ No newline at end of file
+        return issues
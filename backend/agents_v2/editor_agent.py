@@ -1,7 +1,10 @@
 """Interactive code editing agent using Pydantic AI."""
 
+import os
 import uuid
-from typing import List, Dict, Any, Optional
+import difflib
+import functools
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from pydantic_ai import RunContext
@@ -17,6 +20,70 @@ from .models import (
     CodeLocation
 )
 
+# Undo entries kept per session; the oldest are dropped beyond this
+_UNDO_LIMIT = int(os.getenv("EDITOR_UNDO_LIMIT", "200"))
+
+# Every byte except the six bracket characters, dropped by bytes.translate
+_NON_BRACKET_BYTES = bytes(b for b in range(256) if b not in b'()[]{}')
+
+
+def _bracket_counts(code: str) -> Dict[str, int]:
+    """Count bracket characters with one C-level pass over the source.
+    
+    Args:
+        code: Code to scan
+        
+    Returns:
+        Count per bracket character
+    """
+    # UTF-8 continuation bytes are all >= 0x80, so they never alias a bracket
+    brackets = code.encode('utf-8').translate(None, _NON_BRACKET_BYTES)
+    return {char: brackets.count(char.encode()) for char in '()[]{}'}
+
+
+@functools.lru_cache(maxsize=128)
+def _python_errors(code: str) -> Tuple[str, ...]:
+    """Run the Python syntax and bracket checks on a code snapshot.
+    
+    Cached by content so undo/redo back to a seen state skips both the
+    parse and the bracket scan.
+    
+    Args:
+        code: Python source
+        
+    Returns:
+        Validation error messages (empty when the code is valid)
+    """
+    errors = []
+    
+    # Check for basic Python syntax issues. compile() rather than ast.parse():
+    # errors such as 'return' outside function are only raised past parsing
+    try:
+        compile(code, '<string>', 'exec')
+    except SyntaxError as e:
+        errors.append(f"Syntax error: {e.msg} at line {e.lineno}")
+    
+    # Check for common issues
+    counts = _bracket_counts(code)
+    if counts['('] != counts[')']:
+        errors.append("Mismatched parentheses")
+    if counts['['] != counts[']']:
+        errors.append("Mismatched brackets")
+    if counts['{'] != counts['}']:
+        errors.append("Mismatched braces")
+    
+    return tuple(errors)
+
+
+def _join_lines(lines: List[str]) -> Optional[str]:
+    """Content string for a line range; None marks an empty range."""
+    return '\n'.join(lines) if lines else None
+
+
+def _split_content(content: Optional[str]) -> List[str]:
+    """Inverse of _join_lines."""
+    return [] if content is None else content.split('\n')
+
 
 class CodeEditorAgent(BaseCodeAgent):
     """Agent specialized in interactive code editing and modification."""
@@ -47,19 +114,11 @@ class CodeEditorAgent(BaseCodeAgent):
             Returns:
                 Session ID
             """
-            session_id = str(uuid.uuid4())
-            
-            session = EditSession(
-                session_id=session_id,
-                code_context=CodeContext(
-                    code=code,
-                    language=language,
-                    file_path=file_path
-                ),
-                current_code=code
-            )
-            
-            return session_id
+            return await self.create_session(CodeContext(
+                code=code,
+                language=language,
+                file_path=file_path
+            ))
         
         @self.agent.tool
         async def apply_edit_operation(
@@ -76,64 +135,7 @@ class CodeEditorAgent(BaseCodeAgent):
             Returns:
                 Result of the operation
             """
-            if session_id not in self.active_sessions:
-                return {"error": "Session not found"}
-            
-            session = self.active_sessions[session_id]
-            
-            try:
-                # Apply the edit based on operation type
-                if operation.type == "replace":
-                    new_code = session.current_code.replace(
-                        operation.original_content or "",
-                        operation.new_content or ""
-                    )
-                elif operation.type == "insert":
-                    lines = session.current_code.split('\n')
-                    line_num = operation.location.line_start - 1
-                    lines.insert(line_num, operation.new_content or "")
-                    new_code = '\n'.join(lines)
-                elif operation.type == "delete":
-                    lines = session.current_code.split('\n')
-                    start = operation.location.line_start - 1
-                    end = operation.location.line_end or start
-                    del lines[start:end + 1]
-                    new_code = '\n'.join(lines)
-                else:
-                    return {"error": f"Unsupported operation type: {operation.type}"}
-                
-                # Store previous state for undo
-                session.undo_stack.append(EditOperation(
-                    id=str(uuid.uuid4()),
-                    type="replace",
-                    location=CodeLocation(
-                        file_path=session.code_context.file_path or "unknown",
-                        line_start=1,
-                        line_end=len(session.current_code.split('\n'))
-                    ),
-                    original_content=new_code,
-                    new_content=session.current_code,
-                    description="Undo operation"
-                ))
-                
-                # Update session
-                session.current_code = new_code
-                session.applied_edits.append(operation)
-                session.updated_at = datetime.now()
-                operation.applied = True
-                operation.applied_at = datetime.now()
-                
-                # Clear redo stack
-                session.redo_stack.clear()
-                
-                return {
-                    "success": True,
-                    "new_code": new_code,
-                    "operation_id": operation.id
-                }
-                
-            except Exception as e:
-                return {"error": str(e)}
+            return await self.apply_edit(session_id, operation)
         
         @self.agent.tool
         async def undo_last_edit(ctx: RunContext[Any], session_id: str) -> Dict[str, Any]:
@@ -145,40 +147,7 @@ class CodeEditorAgent(BaseCodeAgent):
             Returns:
                 Result of undo operation
             """
-            if session_id not in self.active_sessions:
-                return {"error": "Session not found"}
-            
-            session = self.active_sessions[session_id]
-            
-            if not session.undo_stack:
-                return {"error": "Nothing to undo"}
-            
-            # Get last undo operation
-            undo_op = session.undo_stack.pop()
-            
-            # Store current state for redo
-            session.redo_stack.append(EditOperation(
-                id=str(uuid.uuid4()),
-                type="replace",
-                location=CodeLocation(
-                    file_path=session.code_context.file_path or "unknown",
-                    line_start=1,
-                    line_end=len(session.current_code.split('\n'))
-                ),
-                original_content=session.current_code,
-                new_content=undo_op.original_content or "",
-                description="Redo operation"
-            ))
-            
-            # Apply undo
-            session.current_code = undo_op.original_content or ""
-            session.updated_at = datetime.now()
-            
-            return {
-                "success": True,
-                "new_code": session.current_code,
-                "operation_id": undo_op.id
-            }
+            return await self.undo_edit(session_id)
         
         @self.agent.tool
         async def redo_last_edit(ctx: RunContext[Any], session_id: str) -> Dict[str, Any]:
@@ -190,40 +159,7 @@ class CodeEditorAgent(BaseCodeAgent):
             Returns:
                 Result of redo operation
             """
-            if session_id not in self.active_sessions:
-                return {"error": "Session not found"}
-            
-            session = self.active_sessions[session_id]
-            
-            if not session.redo_stack:
-                return {"error": "Nothing to redo"}
-            
-            # Get last redo operation
-            redo_op = session.redo_stack.pop()
-            
-            # Store current state for undo
-            session.undo_stack.append(EditOperation(
-                id=str(uuid.uuid4()),
-                type="replace",
-                location=CodeLocation(
-                    file_path=session.code_context.file_path or "unknown",
-                    line_start=1,
-                    line_end=len(session.current_code.split('\n'))
-                ),
-                original_content=session.current_code,
-                new_content=redo_op.new_content or "",
-                description="Undo operation"
-            ))
-            
-            # Apply redo
-            session.current_code = redo_op.new_content or ""
-            session.updated_at = datetime.now()
-            
-            return {
-                "success": True,
-                "new_code": session.current_code,
-                "operation_id": redo_op.id
-            }
+            return await self.redo_edit(session_id)
         
         @self.agent.tool
         async def validate_session_code(ctx: RunContext[Any], session_id: str) -> ValidationResult:
@@ -235,47 +171,228 @@ class CodeEditorAgent(BaseCodeAgent):
             Returns:
                 Validation result
             """
-            if session_id not in self.active_sessions:
-                return ValidationResult(
-                    valid=False,
-                    errors=["Session not found"]
-                )
+            return await self.validate_session(session_id)
+    
+    def _range_edit(
+        self,
+        session: EditSession,
+        start: int,
+        old_lines: List[str],
+        new_lines: List[str],
+        description: str
+    ) -> EditOperation:
+        """Build the operation that reverts a line range edit.
+        
+        The operation replaces ``new_lines`` (now at ``start``) with
+        ``old_lines``, so undo/redo history grows with the edit size rather
+        than the file size.
+        
+        Args:
+            session: Edited session
+            start: Zero-based first line of the edited range
+            old_lines: Lines before the edit
+            new_lines: Lines after the edit
+            description: Operation description
             
-            session = self.active_sessions[session_id]
+        Returns:
+            Reverting edit operation
+        """
+        return EditOperation(
+            id=str(uuid.uuid4()),
+            type="replace",
+            location=CodeLocation(
+                file_path=session.code_context.file_path or "unknown",
+                line_start=start + 1,
+                line_end=start + len(new_lines)
+            ),
+            original_content=_join_lines(new_lines),
+            new_content=_join_lines(old_lines),
+            description=description
+        )
+    
+    def _revert(self, session: EditSession, operation: EditOperation, description: str) -> EditOperation:
+        """Apply a reverting operation and return its own inverse.
+        
+        Args:
+            session: Edited session
+            operation: Operation built by _range_edit
+            description: Description for the returned inverse
+            
+        Returns:
+            Operation that re-applies the reverted edit
+        """
+        start = operation.location.line_start - 1
+        current_lines = _split_content(operation.original_content)
+        restored_lines = _split_content(operation.new_content)
+        session.buffer.replace_range(start, start + len(current_lines), restored_lines)
+        return self._range_edit(session, start, current_lines, restored_lines, description)
+    
+    async def apply_edit(self, session_id: str, operation: EditOperation) -> Dict[str, Any]:
+        """Apply an edit operation to a session.
+        
+        Args:
+            session_id: Session ID
+            operation: Edit operation to apply
+            
+        Returns:
+            Result of the operation
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return {"error": "Session not found"}
+        
+        buffer = session.buffer
+        
+        try:
+            # Apply the edit based on operation type
+            if operation.type == "replace":
+                # Only the lines in operation.location are rewritten
+                old = operation.original_content or ""
+                new = operation.new_content or ""
+                start = max(operation.location.line_start - 1, 0)
+                end = operation.location.line_end or operation.location.line_start + old.count('\n')
+                if start >= len(buffer) or end <= start:
+                    return {"error": "Edit location is outside the code"}
+                if old:
+                    region = '\n'.join(buffer[start:end])
+                    if old not in region:
+                        return {"error": "Original content not found at the edit location"}
+                    new_lines = region.replace(old, new, 1).split('\n')
+                else:
+                    new_lines = new.split('\n')
+                old_lines = buffer.replace_range(start, end, new_lines)
+            elif operation.type == "insert":
+                start = min(max(operation.location.line_start - 1, 0), len(buffer))
+                new_lines = (operation.new_content or "").split('\n')
+                old_lines = buffer.replace_range(start, start, new_lines)
+            elif operation.type == "delete":
+                start = max(operation.location.line_start - 1, 0)
+                end = operation.location.line_end or operation.location.line_start
+                new_lines = []
+                old_lines = buffer.delete(start, end)
+                if not len(buffer):
+                    # Deleting every line leaves one empty line, as in split('\n')
+                    new_lines = [""]
+                    buffer.insert(0, "")
+            else:
+                return {"error": f"Unsupported operation type: {operation.type}"}
             
-            # Perform basic validation
-            errors = []
-            warnings = []
+            # Store the replaced line range for undo
+            session.undo_stack.append(
+                self._range_edit(session, start, old_lines, new_lines, "Undo operation")
+            )
+            if len(session.undo_stack) > _UNDO_LIMIT:
+                del session.undo_stack[:-_UNDO_LIMIT]
             
-            # Check for basic syntax (simplified)
-            code = session.current_code
-            language = session.code_context.language
+            # Update session
+            session.applied_edits.append(operation)
+            session.updated_at = datetime.now()
+            operation.applied = True
+            operation.applied_at = datetime.now()
             
-            if language == "python":
-                # Check for basic Python syntax issues
-                try:
-                    compile(code, '<string>', 'exec')
-                except SyntaxError as e:
-                    errors.append(f"Syntax error: {e.msg} at line {e.lineno}")
-                
-                # Check for common issues
-                if code.count('(') != code.count(')'):
-                    errors.append("Mismatched parentheses")
-                if code.count('[') != code.count(']'):
-                    errors.append("Mismatched brackets")
-                if code.count('{') != code.count('}'):
-                    errors.append("Mismatched braces")
+            # Clear redo stack
+            session.redo_stack.clear()
             
+            return {
+                "success": True,
+                "new_code": session.current_code,
+                "operation_id": operation.id
+            }
+            
+        except Exception as e:
+            return {"error": str(e)}
+    
+    async def undo_edit(self, session_id: str) -> Dict[str, Any]:
+        """Undo the last edit operation.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            Result of undo operation
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return {"error": "Session not found"}
+        
+        if not session.undo_stack:
+            return {"error": "Nothing to undo"}
+        
+        # Apply undo and store its inverse for redo
+        undo_op = session.undo_stack.pop()
+        session.redo_stack.append(self._revert(session, undo_op, "Redo operation"))
+        session.updated_at = datetime.now()
+        
+        return {
+            "success": True,
+            "new_code": session.current_code,
+            "operation_id": undo_op.id
+        }
+    
+    async def redo_edit(self, session_id: str) -> Dict[str, Any]:
+        """Redo the last undone edit operation.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            Result of redo operation
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return {"error": "Session not found"}
+        
+        if not session.redo_stack:
+            return {"error": "Nothing to redo"}
+        
+        # Apply redo and store its inverse for undo
+        redo_op = session.redo_stack.pop()
+        session.undo_stack.append(self._revert(session, redo_op, "Undo operation"))
+        session.updated_at = datetime.now()
+        
+        return {
+            "success": True,
+            "new_code": session.current_code,
+            "operation_id": redo_op.id
+        }
+    
+    async def validate_session(self, session_id: str) -> ValidationResult:
+        """Validate the current code in a session.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            Validation result
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None:
             return ValidationResult(
-                valid=len(errors) == 0,
-                syntax_valid=len(errors) == 0,
-                errors=errors,
-                warnings=warnings,
-                metrics={
-                    "lines": len(code.split('\n')),
-                    "characters": len(code)
-                }
+                valid=False,
+                errors=["Session not found"]
             )
+        
+        # Perform basic validation
+        errors = []
+        warnings = []
+        
+        # Check for basic syntax (simplified)
+        code = session.current_code
+        language = session.code_context.language
+        
+        if language == "python":
+            errors.extend(_python_errors(code))
+        
+        return ValidationResult(
+            valid=len(errors) == 0,
+            syntax_valid=len(errors) == 0,
+            errors=errors,
+            warnings=warnings,
+            metrics={
+                "lines": session.buffer.line_count,
+                "characters": len(code)
+            }
+        )
     
     async def create_session(self, context: CodeContext) -> str:
         """Create a new editing session.
@@ -286,11 +403,7 @@ class CodeEditorAgent(BaseCodeAgent):
         Returns:
             Session ID
         """
-        session_id = await self.agent.tools.create_edit_session(
-            context.code,
-            context.language,
-            context.file_path
-        )
+        session_id = str(uuid.uuid4())
         
         session = EditSession(
             session_id=session_id,
@@ -315,17 +428,83 @@ class CodeEditorAgent(BaseCodeAgent):
         Returns:
             Result of applying the recommendation
         """
-        if session_id not in self.active_sessions:
+        session = self.active_sessions.get(session_id)
+        if session is None:
             return {"error": "Session not found"}
         
+        result = await self._apply_recommendation_edit(session, recommendation)
+        
+        if result.get("success"):
+            # Validate the changes
+            validation = await self.validate_session(session_id)
+            session.validation_status = validation
+            
+            result["validation"] = validation.dict()
+        
+        return result
+    
+    async def apply_recommendations_batch(
+        self,
+        session_id: str,
+        recommendations: List[CodeRecommendation]
+    ) -> List[Dict[str, Any]]:
+        """Apply several recommendations to a session, validating once.
+        
+        Each recommendation is located and applied in turn against the code
+        left by the previous ones; the session is validated after the last
+        edit instead of after every edit.
+        
+        Args:
+            session_id: Session ID
+            recommendations: Recommendations to apply, in order
+            
+        Returns:
+            Result of applying each recommendation, in the same order
+        """
+        session = self.active_sessions.get(session_id)
+        if session is None:
+            return [{"error": "Session not found"} for _ in recommendations]
+        
+        results = []
+        for recommendation in recommendations:
+            try:
+                results.append(await self._apply_recommendation_edit(session, recommendation))
+            except Exception as e:
+                results.append({"error": str(e)})
+        
+        if any(result.get("success") for result in results):
+            session.validation_status = await self.validate_session(session_id)
+        
+        return results
+    
+    async def _apply_recommendation_edit(
+        self,
+        session: EditSession,
+        recommendation: CodeRecommendation
+    ) -> Dict[str, Any]:
+        """Turn a recommendation into a replace edit and apply it.
+        
+        Args:
+            session: Session to edit
+            recommendation: Recommendation to apply
+            
+        Returns:
+            Result of the edit
+        """
+        # Locate the lines holding the original snippet
+        original = recommendation.original_code
+        offset = session.current_code.find(original) if original else -1
+        if offset < 0:
+            return {"error": "Original code not found in session"}
+        
         # Create edit operation from recommendation
         operation = EditOperation(
             id=str(uuid.uuid4()),
             type="replace",
             location=CodeLocation(
-                file_path=self.active_sessions[session_id].code_context.file_path or "unknown",
-                line_start=1,
-                line_end=1
+                file_path=session.code_context.file_path or "unknown",
+                line_start=session.buffer.line_at(offset) + 1,
+                line_end=session.buffer.line_at(offset + len(original) - 1) + 1
             ),
             original_content=recommendation.original_code,
             new_content=recommendation.suggested_code,
@@ -333,16 +512,7 @@ class CodeEditorAgent(BaseCodeAgent):
             recommendation_id=recommendation.issue_id
         )
         
-        result = await self.agent.tools.apply_edit_operation(session_id, operation)
-        
-        if result.get("success"):
-            # Validate the changes
-            validation = await self.agent.tools.validate_session_code(session_id)
-            self.active_sessions[session_id].validation_status = validation
-            
-            result["validation"] = validation.dict()
-        
-        return result
+        return await self.apply_edit(session.session_id, operation)
     
     async def get_session_diff(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get diff between original and current code.
@@ -353,39 +523,35 @@ class CodeEditorAgent(BaseCodeAgent):
         Returns:
             Diff information
         """
-        if session_id not in self.active_sessions:
+        session = self.active_sessions.get(session_id)
+        if session is None:
             return None
         
-        session = self.active_sessions[session_id]
-        original = session.code_context.code
-        current = session.current_code
-        
-        # Simple diff calculation
-        original_lines = original.split('\n')
-        current_lines = current.split('\n')
+        original_lines = session.original_lines
+        current_lines = session.buffer
         
         added_lines = []
         removed_lines = []
         modified_lines = []
         
-        # Basic diff algorithm
-        for i, (orig, curr) in enumerate(zip(original_lines, current_lines)):
-            if orig != curr:
+        # Align unchanged runs so an insertion doesn't mark every later line modified
+        matcher = difflib.SequenceMatcher(None, original_lines, current_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for k in range(paired):
                 modified_lines.append({
-                    "line": i + 1,
-                    "original": orig,
-                    "current": curr
+                    "line": j1 + k + 1,
+                    "original": original_lines[i1 + k],
+                    "current": current_lines[j1 + k]
                 })
-        
-        # Handle length differences
-        if len(current_lines) > len(original_lines):
-            for i in range(len(original_lines), len(current_lines)):
+            for j in range(j1 + paired, j2):
                 added_lines.append({
-                    "line": i + 1,
-                    "content": current_lines[i]
+                    "line": j + 1,
+                    "content": current_lines[j]
                 })
-        elif len(original_lines) > len(current_lines):
-            for i in range(len(current_lines), len(original_lines)):
+            for i in range(i1 + paired, i2):
                 removed_lines.append({
                     "line": i + 1,
                     "content": original_lines[i]
@@ -409,13 +575,9 @@ class CodeEditorAgent(BaseCodeAgent):
         Returns:
             Final code or None if session not found
         """
-        if session_id not in self.active_sessions:
-            return None
-        
-        session = self.active_sessions[session_id]
-        final_code = session.current_code
-        
         # Clean up session
-        del self.active_sessions[session_id]
+        session = self.active_sessions.pop(session_id, None)
+        if session is None:
+            return None
         
-        return final_code
\ No newline at end of file
+        return session.current_code
\ No newline at end of file
@@ -1,23 +1,358 @@
 """Code fixing agent using Pydantic AI."""
 
+import os
 import re
-import uuid
-from typing import List, Dict, Any, Optional, Tuple
+import logging
+import functools
+from array import array
+from typing import List, Dict, Any, AsyncIterator, Optional, Sequence, Tuple
 
 from pydantic_ai import RunContext
 from typing import Any
 
-from .base_agent import BaseCodeAgent
+from .base_agent import BaseCodeAgent, issue_ids, issue_tags
 from .models import (
     CodeContext,
     CodeIssue,
     CodeRecommendation,
+    CodeLocation,
     EditOperation,
     ValidationResult,
     SeverityLevel,
     IssueCategory
 )
 
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns shared by the fix tools
+# A quoted SQL fragment concatenated with str(value): quote, SQL, value
+_SQL_CONCAT = re.compile(r'(["\'])([^"\']*)\1\s*\+\s*str\(([^)]+)\)')
+_SQL_KEYWORD = re.compile(r'\b(?:SELECT|WHERE|INSERT|UPDATE)\b', re.IGNORECASE)
+_DEF_NAME = re.compile(r'def\s+([a-zA-Z_]\w*)')
+_CLASS_NAME = re.compile(r'class\s+([a-z_]\w*)')
+_RANGE_LEN = re.compile(r'for\s+(\w+)\s+in\s+range\(len\((\w+)\)\)')
+_RANGE_LEN_NOIDX = re.compile(r'for\s+\w+\s+in\s+range\(len\((\w+)\)\)')
+_BARE_EXCEPT = re.compile(r'except\s*:')
+_EXCEPTION_ORDER = ('IOError', 'ValueError', 'KeyError', 'ZeroDivisionError')
+
+# Ids for applied edits, drawn from batched randomness
+_edit_ids = issue_ids()
+
+
+def _camel_to_snake(name: str) -> str:
+    """Convert a camelCase name to snake_case in one character pass.
+    
+    A word boundary is a capital after a lowercase letter or digit, or a
+    capital followed by a lowercase letter anywhere but the start.
+    """
+    out = []
+    prev = ''
+    last = len(name) - 1
+    for i, ch in enumerate(name):
+        if 'A' <= ch <= 'Z' and i and (
+            'a' <= prev <= 'z' or '0' <= prev <= '9'
+            or (i < last and 'a' <= name[i + 1] <= 'z')
+        ):
+            out.append('_')
+        out.append(ch)
+        prev = ch
+    return ''.join(out).lower()
+
+
+def _indent_of(line: str) -> int:
+    """Return the width of a line's leading whitespace."""
+    return len(line) - len(line.lstrip())
+
+
+def _parameterize_sql(match: re.Match) -> str:
+    """Rewrite one SQL + str(value) concatenation as a placeholder query."""
+    quote, sql, value = match.groups()
+    return f'{quote}{sql.rstrip()} ?{quote}, ({value},)'
+
+
+class _LineIndex(Sequence[str]):
+    """Read-only line view of a code string.
+    
+    Lines are sliced out of the string on access. Line start offsets are
+    found lazily up to the furthest line read, so a fix near the top of a
+    large file never splits the rest of it into line objects.
+    """
+    
+    __slots__ = ("_code", "_starts", "_count")
+    
+    def __init__(self, code: str):
+        self._code = code
+        self._starts = array('q', [0])
+        self._count = code.count('\n') + 1
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def _line(self, index: int) -> str:
+        starts = self._starts
+        find = self._code.find
+        # One extra start marks the end of the line, except for the last line
+        needed = min(index + 1, self._count - 1)
+        while len(starts) <= needed:
+            starts.append(find('\n', starts[-1]) + 1)
+        if index + 1 < self._count:
+            return self._code[starts[index]:starts[index + 1] - 1]
+        return self._code[starts[index]:]
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._line(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("line index out of range")
+        return self._line(index)
+
+
+def _line_span(code: str, line_start: int, line_end: int) -> Optional[Tuple[int, int]]:
+    """Return the character span of 1-based lines ``line_start..line_end``.
+    
+    The span excludes the trailing newline. Returns None when the range
+    falls outside the code.
+    """
+    if line_start <= 0 or line_end < line_start:
+        return None
+    start = 0
+    for _ in range(line_start - 1):
+        start = code.find('\n', start) + 1
+        if not start:
+            return None
+    end = start
+    for _ in range(line_end - line_start):
+        end = code.find('\n', end) + 1
+        if not end:
+            return None
+    end = code.find('\n', end)
+    return start, len(code) if end == -1 else end
+
+
+def _sql_injection_fix(lines: Sequence[str], issue_line: int) -> Dict[str, Any]:
+    """Generate fix for SQL injection vulnerability.
+    
+    Args:
+        lines: Code lines
+        issue_line: Line with the issue
+        
+    Returns:
+        Fix information
+    """
+    if issue_line <= 0 or issue_line > len(lines):
+        return {"error": "Invalid line number"}
+    
+    original_line = lines[issue_line - 1]
+    fixed_line = original_line
+    
+    # Fix string concatenation in SQL
+    if '+' in original_line and _SQL_KEYWORD.search(original_line):
+        # Replace string concatenation with parameterized query
+        if 'str(' in original_line:
+            # Python example: "SELECT * FROM users WHERE id = " + str(user_id)
+            # One substitution both adds the placeholder and moves the
+            # value into a parameter tuple
+            fixed_line = _SQL_CONCAT.sub(_parameterize_sql, original_line)
+        
+        return {
+            "original": original_line,
+            "fixed": fixed_line,
+            "explanation": "Use parameterized queries to prevent SQL injection"
+        }
+    
+    return {"error": "Could not generate fix"}
+
+
+def _naming_convention_fix(lines: Sequence[str], issue_line: int, convention: str) -> Dict[str, Any]:
+    """Fix naming convention issues.
+    
+    Args:
+        lines: Code lines
+        issue_line: Line with the issue
+        convention: Target naming convention
+        
+    Returns:
+        Fix information
+    """
+    if issue_line <= 0 or issue_line > len(lines):
+        return {"error": "Invalid line number"}
+    
+    original_line = lines[issue_line - 1]
+    fixed_line = original_line
+    
+    if convention == "snake_case":
+        # Fix function names
+        if 'def ' in original_line:
+            func_match = _DEF_NAME.search(original_line)
+            if func_match:
+                old_name = func_match.group(1)
+                new_name = _camel_to_snake(old_name)
+                fixed_line = original_line.replace(f'def {old_name}', f'def {new_name}')
+    
+    elif convention == "PascalCase":
+        # Convert to PascalCase for classes
+        if 'class ' in original_line:
+            class_match = _CLASS_NAME.search(original_line)
+            if class_match:
+                old_name = class_match.group(1)
+                new_name = ''.join(word.capitalize() for word in old_name.split('_'))
+                fixed_line = original_line.replace(f'class {old_name}', f'class {new_name}')
+    
+    return {
+        "original": original_line,
+        "fixed": fixed_line,
+        "explanation": f"Fixed naming to follow {convention} convention"
+    }
+
+
+def _loop_fix(lines: Sequence[str], issue_line: int) -> Dict[str, Any]:
+    """Optimize inefficient loop patterns.
+    
+    Args:
+        lines: Code lines
+        issue_line: Line with the issue
+        
+    Returns:
+        Optimized code
+    """
+    if issue_line <= 0 or issue_line > len(lines):
+        return {"error": "Invalid line number"}
+    
+    original_line = lines[issue_line - 1]
+    fixed_line = original_line
+    
+    # Fix range(len()) pattern
+    if 'for' in original_line and 'range(len(' in original_line:
+        # Extract variable names
+        match = _RANGE_LEN.search(original_line)
+        if match:
+            index_var = match.group(1)
+            list_var = match.group(2)
+            # Check if index is used in the loop body
+            body_parts = []
+            indent = _indent_of(original_line)
+            for next_line in lines[issue_line:issue_line + 10]:
+                # One lstrip serves both the blank-line test and the indent;
+                # blank lines never end the body
+                content = next_line.lstrip()
+                if content and len(next_line) - len(content) <= indent:
+                    break
+                body_parts.append(next_line)
+            loop_body = '\n'.join(body_parts)
+            
+            # If index is used, use enumerate; match whole words so a
+            # short name like 'i' is not found inside 'print'
+            if re.search(rf'\b{re.escape(index_var)}\b', loop_body):
+                fixed_line = _RANGE_LEN.sub(r'for \1, item in enumerate(\2)', original_line)
+            else:
+                # If index not used, iterate directly
+                fixed_line = _RANGE_LEN_NOIDX.sub(r'for item in \1', original_line)
+    
+    # Fix .keys() iteration
+    elif '.keys()' in original_line:
+        fixed_line = original_line.replace('.keys()', '')
+    
+    return {
+        "original": original_line,
+        "fixed": fixed_line,
+        "explanation": "Optimized loop pattern for better performance"
+    }
+
+
+def _exception_handling_fix(lines: Sequence[str], issue_line: int) -> Dict[str, Any]:
+    """Fix broad exception handling.
+    
+    Args:
+        lines: Code lines
+        issue_line: Line with the issue
+        
+    Returns:
+        Fixed exception handling
+    """
+    if issue_line <= 0 or issue_line > len(lines):
+        return {"error": "Invalid line number"}
+    
+    original_line = lines[issue_line - 1]
+    
+    # Fix bare except
+    if _BARE_EXCEPT.search(original_line):
+        # Look at the try block to determine likely exceptions
+        try_line = -1
+        for i in range(issue_line - 2, max(-1, issue_line - 20), -1):
+            if 'try:' in lines[i]:
+                try_line = i
+                break
+        
+        # Analyze try block content line by line rather than joining it;
+        # no marker spans a newline, so the result is the same
+        exceptions = []
+        if try_line >= 0:
+            found = set()
+            for ln in lines[try_line:issue_line-1]:
+                if 'open(' in ln or 'file' in ln:
+                    found.add('IOError')
+                if 'int(' in ln or 'float(' in ln:
+                    found.add('ValueError')
+                if '[' in ln or 'dict' in ln:
+                    found.add('KeyError')
+                if '/' in ln:
+                    found.add('ZeroDivisionError')
+            
+            # Keep the reporting order stable regardless of line order
+            exceptions = [name for name in _EXCEPTION_ORDER if name in found]
+            if not exceptions:
+                exceptions = ['Exception']  # At least use Exception instead of bare
+        
+        caught = ', '.join(exceptions)
+        fixed_line = original_line.replace('except:', f'except ({caught}):')
+        
+        return {
+            "original": original_line,
+            "fixed": fixed_line,
+            "explanation": f"Catch specific exceptions: {caught}"
+        }
+    
+    return {"error": "Could not generate fix"}
+
+
+def _naming_fix_for_tags(lines: Sequence[str], issue_line: int, tags: frozenset) -> Dict[str, Any]:
+    """Pick the naming convention from the issue tags and apply it."""
+    convention = "snake_case" if "snake" in tags else "PascalCase"
+    return _naming_convention_fix(lines, issue_line, convention)
+
+
+# Fix strategy per issue category: the tag the issue must carry, and the
+# helper called with (lines, issue_line, tags)
+_FIX_STRATEGIES = {
+    IssueCategory.SECURITY: ("sql", lambda lines, line, tags: _sql_injection_fix(lines, line)),
+    IssueCategory.STYLE: ("naming", _naming_fix_for_tags),
+    IssueCategory.PERFORMANCE: ("loop", lambda lines, line, tags: _loop_fix(lines, line)),
+    IssueCategory.QUALITY: ("exception", lambda lines, line, tags: _exception_handling_fix(lines, line)),
+}
+
+
+# Sample (helper, code, issue line, extra args) that take each fix helper
+# down its rewrite path
+_WARMUP_CASES = (
+    (_sql_injection_fix, "x = 'SELECT * FROM t WHERE id = ' + str(1)", 1, ()),
+    (_naming_convention_fix, "def fooBar(): pass", 1, ("snake_case",)),
+    (_loop_fix, "for i in range(len(xs)):\n    print(xs[i])", 1, ()),
+    (_exception_handling_fix, "try:\n    x = int(s)\nexcept:\n    pass", 3, ()),
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _warm_up_fix_tools() -> None:
+    """Run every fix helper once so its first real call pays no setup cost.
+    
+    This fills re's pattern cache for the per-call patterns and loads the
+    code paths before the first issue arrives. Runs once per process.
+    """
+    for helper, code, issue_line, extra in _WARMUP_CASES:
+        helper(_LineIndex(code), issue_line, *extra)
+
 
 class CodeFixAgent(BaseCodeAgent):
     """Agent specialized in generating and validating code fixes."""
@@ -30,6 +365,8 @@ class CodeFixAgent(BaseCodeAgent):
             async_azure_client=async_azure_client,
             model_name=model_name
         )
+        if os.getenv("AGENT_FIX_WARMUP", "1") == "1":
+            _warm_up_fix_tools()
         
     def _register_tools(self):
         """Register code fixing specific tools."""
@@ -46,32 +383,7 @@ class CodeFixAgent(BaseCodeAgent):
             Returns:
                 Fix information
             """
-            lines = code.split('\n')
-            if issue_line <= 0 or issue_line > len(lines):
-                return {"error": "Invalid line number"}
-            
-            original_line = lines[issue_line - 1]
-            fixed_line = original_line
-            
-            # Fix string concatenation in SQL
-            if '+' in original_line and any(sql in original_line.upper() for sql in ['SELECT', 'WHERE', 'INSERT', 'UPDATE']):
-                # Replace string concatenation with parameterized query
-                if 'str(' in original_line:
-                    # Python example: "SELECT * FROM users WHERE id = " + str(user_id)
-                    fixed_line = re.sub(
-                        r'(["\'])([^"\']*)\1\s*\+\s*str\([^)]+\)',
-                        r'\1\2\1, (\3,)',
-                        original_line
-                    )
-                    fixed_line = re.sub(r'WHERE\s+(\w+)\s*=\s*["\']', r'WHERE \1 = ?', fixed_line)
-                
-                return {
-                    "original": original_line,
-                    "fixed": fixed_line,
-                    "explanation": "Use parameterized queries to prevent SQL injection"
-                }
-            
-            return {"error": "Could not generate fix"}
+            return _sql_injection_fix(_LineIndex(code), issue_line)
         
         @self.agent.tool
         async def fix_naming_convention(ctx: RunContext[Any], code: str, issue_line: int, convention: str) -> Dict[str, Any]:
@@ -85,41 +397,7 @@ class CodeFixAgent(BaseCodeAgent):
             Returns:
                 Fix information
             """
-            lines = code.split('\n')
-            if issue_line <= 0 or issue_line > len(lines):
-                return {"error": "Invalid line number"}
-            
-            original_line = lines[issue_line - 1]
-            fixed_line = original_line
-            
-            if convention == "snake_case":
-                # Convert camelCase to snake_case
-                def camel_to_snake(name):
-                    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-                    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
-                
-                # Fix function names
-                if 'def ' in original_line:
-                    func_match = re.search(r'def\s+([a-zA-Z_]\w*)', original_line)
-                    if func_match:
-                        old_name = func_match.group(1)
-                        new_name = camel_to_snake(old_name)
-                        fixed_line = original_line.replace(f'def {old_name}', f'def {new_name}')
-            
-            elif convention == "PascalCase":
-                # Convert to PascalCase for classes
-                if 'class ' in original_line:
-                    class_match = re.search(r'class\s+([a-z_]\w*)', original_line)
-                    if class_match:
-                        old_name = class_match.group(1)
-                        new_name = ''.join(word.capitalize() for word in old_name.split('_'))
-                        fixed_line = original_line.replace(f'class {old_name}', f'class {new_name}')
-            
-            return {
-                "original": original_line,
-                "fixed": fixed_line,
-                "explanation": f"Fixed naming to follow {convention} convention"
-            }
+            return _naming_convention_fix(_LineIndex(code), issue_line, convention)
         
         @self.agent.tool
         async def optimize_loop(ctx: RunContext[Any], code: str, issue_line: int) -> Dict[str, Any]:
@@ -132,54 +410,7 @@ class CodeFixAgent(BaseCodeAgent):
             Returns:
                 Optimized code
             """
-            lines = code.split('\n')
-            if issue_line <= 0 or issue_line > len(lines):
-                return {"error": "Invalid line number"}
-            
-            original_line = lines[issue_line - 1]
-            fixed_line = original_line
-            
-            # Fix range(len()) pattern
-            if 'for' in original_line and 'range(len(' in original_line:
-                # Extract variable names
-                match = re.search(r'for\s+(\w+)\s+in\s+range\(len\((\w+)\)\)', original_line)
-                if match:
-                    index_var = match.group(1)
-                    list_var = match.group(2)
-                    # Check if index is used in the loop body
-                    loop_body = []
-                    indent = len(original_line) - len(original_line.lstrip())
-                    for i in range(issue_line, min(issue_line + 10, len(lines))):
-                        next_line = lines[i]
-                        next_indent = len(next_line) - len(next_line.lstrip())
-                        if next_indent <= indent and next_line.strip():
-                            break
-                        loop_body.append(next_line)
-                    
-                    # If index is used, use enumerate
-                    if any(index_var in line for line in loop_body):
-                        fixed_line = re.sub(
-                            r'for\s+(\w+)\s+in\s+range\(len\((\w+)\)\)',
-                            r'for \1, item in enumerate(\2)',
-                            original_line
-                        )
-                    else:
-                        # If index not used, iterate directly
-                        fixed_line = re.sub(
-                            r'for\s+\w+\s+in\s+range\(len\((\w+)\)\)',
-                            r'for item in \1',
-                            original_line
-                        )
-            
-            # Fix .keys() iteration
-            elif '.keys()' in original_line:
-                fixed_line = original_line.replace('.keys()', '')
-            
-            return {
-                "original": original_line,
-                "fixed": fixed_line,
-                "explanation": "Optimized loop pattern for better performance"
-            }
+            return _loop_fix(_LineIndex(code), issue_line)
         
         @self.agent.tool
         async def fix_exception_handling(ctx: RunContext[Any], code: str, issue_line: int) -> Dict[str, Any]:
@@ -192,50 +423,61 @@ class CodeFixAgent(BaseCodeAgent):
             Returns:
                 Fixed exception handling
             """
-            lines = code.split('\n')
-            if issue_line <= 0 or issue_line > len(lines):
-                return {"error": "Invalid line number"}
-            
-            original_line = lines[issue_line - 1]
-            
-            # Fix bare except
-            if re.search(r'except\s*:', original_line):
-                # Look at the try block to determine likely exceptions
-                try_line = -1
-                for i in range(issue_line - 2, max(0, issue_line - 20), -1):
-                    if 'try:' in lines[i]:
-                        try_line = i
-                        break
-                
-                # Analyze try block content
-                exceptions = []
-                if try_line >= 0:
-                    try_block = '\n'.join(lines[try_line:issue_line-1])
-                    
-                    if 'open(' in try_block or 'file' in try_block:
-                        exceptions.append('IOError')
-                    if 'int(' in try_block or 'float(' in try_block:
-                        exceptions.append('ValueError')
-                    if '[' in try_block or 'dict' in try_block:
-                        exceptions.append('KeyError')
-                    if '/' in try_block:
-                        exceptions.append('ZeroDivisionError')
-                    
-                    if not exceptions:
-                        exceptions = ['Exception']  # At least use Exception instead of bare
-                
-                fixed_line = original_line.replace(
-                    'except:',
-                    f'except ({", ".join(exceptions)}):'
-                )
-                
-                return {
-                    "original": original_line,
-                    "fixed": fixed_line,
-                    "explanation": f"Catch specific exceptions: {', '.join(exceptions)}"
-                }
+            return _exception_handling_fix(_LineIndex(code), issue_line)
+    
+    def _fix_for_lines(self, issue: CodeIssue, lines: Sequence[str]) -> CodeRecommendation:
+        """Build the fix recommendation for an issue from indexed code lines.
+        
+        Args:
+            issue: The issue to fix
+            lines: Code lines
             
-            return {"error": "Could not generate fix"}
+        Returns:
+            Fix recommendation
+        """
+        # Determine fix strategy based on issue category
+        fix_result = None
+        
+        strategy = _FIX_STRATEGIES.get(issue.category)
+        if strategy:
+            # Issues from outside the agents may arrive without tags
+            tags = issue.tags or issue_tags(issue.title, issue.description)
+            if strategy[0] in tags:
+                issue_line = issue.location.line_start if issue.location else 1
+                fix_result = strategy[1](lines, issue_line, tags)
+        
+        # Fields come from the issue and our own fix helpers, so the
+        # recommendations are built without revalidation
+        if fix_result and "error" not in fix_result:
+            # Every fix helper rewrites exactly the issue line
+            return CodeRecommendation.model_construct(
+                issue_id=issue.id,
+                title=f"Fix for {issue.title}",
+                description=fix_result.get("explanation", "Automated fix"),
+                original_code=fix_result.get("original", ""),
+                suggested_code=fix_result.get("fixed", ""),
+                explanation=fix_result.get("explanation", ""),
+                confidence=0.8,
+                auto_fixable=True,
+                requires_review=True,
+                impact="safe" if issue.severity is SeverityLevel.LOW else "moderate",
+                line_start=issue_line,
+                line_end=issue_line
+            )
+        
+        # Fallback to generic fix suggestion
+        return CodeRecommendation.model_construct(
+            issue_id=issue.id,
+            title=f"Manual fix required for {issue.title}",
+            description=issue.description,
+            original_code=issue.code_snippet or "",
+            suggested_code="# TODO: Manual fix required",
+            explanation="This issue requires manual review and fixing",
+            confidence=0.3,
+            auto_fixable=False,
+            requires_review=True,
+            impact="moderate"
+        )
     
     async def generate_fix(
         self,
@@ -252,72 +494,86 @@ class CodeFixAgent(BaseCodeAgent):
             Fix recommendation or None
         """
         try:
-            lines = context.code.split('\n')
-            
-            # Determine fix strategy based on issue category
-            fix_result = None
-            
-            if issue.category == IssueCategory.SECURITY:
-                if "SQL" in issue.title.upper():
-                    fix_result = await self.agent.tools.generate_sql_injection_fix(
-                        context.code,
-                        issue.location.line_start if issue.location else 1
-                    )
-            
-            elif issue.category == IssueCategory.STYLE:
-                if "naming" in issue.title.lower():
-                    convention = "snake_case" if "snake" in issue.description.lower() else "PascalCase"
-                    fix_result = await self.agent.tools.fix_naming_convention(
-                        context.code,
-                        issue.location.line_start if issue.location else 1,
-                        convention
-                    )
-            
-            elif issue.category == IssueCategory.PERFORMANCE:
-                if "loop" in issue.title.lower():
-                    fix_result = await self.agent.tools.optimize_loop(
-                        context.code,
-                        issue.location.line_start if issue.location else 1
-                    )
+            return self._fix_for_lines(issue, _LineIndex(context.code))
+        except Exception as e:
+            logger.error(f"Failed to generate fix: {e}")
+            return None
+    
+    async def generate_fixes(
+        self,
+        issues: List[CodeIssue],
+        context: CodeContext
+    ) -> List[Optional[CodeRecommendation]]:
+        """Generate fix recommendations for many issues over one line index.
+        
+        The fix tools are pure string work with no I/O, so the issues are
+        handled in turn and share one line index of the code.
+        
+        Args:
+            issues: Issues to fix
+            context: Code context
             
-            elif issue.category == IssueCategory.QUALITY:
-                if "exception" in issue.title.lower():
-                    fix_result = await self.agent.tools.fix_exception_handling(
-                        context.code,
-                        issue.location.line_start if issue.location else 1
-                    )
+        Returns:
+            Recommendations in the same order as issues (None where no fix)
+        """
+        lines = _LineIndex(context.code)
+        fixes = []
+        for issue in issues:
+            try:
+                fixes.append(self._fix_for_lines(issue, lines))
+            except Exception as e:
+                logger.error(f"Failed to generate fix: {e}")
+                fixes.append(None)
+        return fixes
+    
+    async def generate_recommendation(
+        self,
+        issue: CodeIssue,
+        context: CodeContext
+    ) -> Optional[CodeRecommendation]:
+        """Generate a fix recommendation using the fix tools.
+        
+        Args:
+            issue: The issue to fix
+            context: Code context
             
-            if fix_result and "error" not in fix_result:
-                return CodeRecommendation(
-                    issue_id=issue.id,
-                    title=f"Fix for {issue.title}",
-                    description=fix_result.get("explanation", "Automated fix"),
-                    original_code=fix_result.get("original", ""),
-                    suggested_code=fix_result.get("fixed", ""),
-                    explanation=fix_result.get("explanation", ""),
-                    confidence=0.8,
-                    auto_fixable=True,
-                    requires_review=True,
-                    impact="safe" if issue.severity == SeverityLevel.LOW else "moderate"
-                )
+        Returns:
+            Fix recommendation or None
+        """
+        return await self.generate_fix(issue, context)
+    
+    async def generate_recommendations_batch(
+        self,
+        issues: List[CodeIssue],
+        context: CodeContext
+    ) -> List[Optional[CodeRecommendation]]:
+        """Generate fix recommendations for many issues.
+        
+        Args:
+            issues: Issues to fix
+            context: Code context
             
-            # Fallback to generic fix suggestion
-            return CodeRecommendation(
-                issue_id=issue.id,
-                title=f"Manual fix required for {issue.title}",
-                description=issue.description,
-                original_code=issue.code_snippet or "",
-                suggested_code="# TODO: Manual fix required",
-                explanation="This issue requires manual review and fixing",
-                confidence=0.3,
-                auto_fixable=False,
-                requires_review=True,
-                impact="moderate"
-            )
+        Returns:
+            Recommendations in the same order as issues (None where no fix)
+        """
+        return await self.generate_fixes(issues, context)
+    
+    async def iter_recommendations(
+        self,
+        issues: List[CodeIssue],
+        context: CodeContext
+    ) -> AsyncIterator[Tuple[int, Optional[CodeRecommendation]]]:
+        """Yield fix recommendations in issue order.
+        
+        Args:
+            issues: Issues to fix
+            context: Code context
             
-        except Exception as e:
-            logger.error(f"Failed to generate fix: {e}")
-            return None
+        Yields:
+            Tuples of (issue index, recommendation or None)
+        """
+        for index, recommendation in enumerate(await self.generate_fixes(issues, context)):
+            yield index, recommendation
     
     async def apply_fix(
         self,
@@ -334,20 +590,34 @@ class CodeFixAgent(BaseCodeAgent):
             Tuple of (fixed code, edit operation)
         """
         try:
-            # Simple replacement for now
-            fixed_code = code.replace(
-                recommendation.original_code,
-                recommendation.suggested_code
-            )
+            original = recommendation.original_code
+            line_start = recommendation.line_start
+            line_end = recommendation.line_end
+            span = None
+            if line_start:
+                if line_end is None:
+                    line_end = line_start + original.count('\n')
+                span = _line_span(code, line_start, line_end)
+                # Only trust the recorded lines if they still hold the original
+                if span and code[span[0]:span[1]] != original:
+                    span = None
+            
+            if span:
+                # Splice the known lines instead of searching the whole file
+                fixed_code = code[:span[0]] + recommendation.suggested_code + code[span[1]:]
+            else:
+                # No usable line range; fall back to text replacement
+                fixed_code = code.replace(original, recommendation.suggested_code)
+                line_start = line_end = 1
             
             # Create edit operation
-            operation = EditOperation(
-                id=str(uuid.uuid4()),
+            operation = EditOperation.model_construct(
+                id=next(_edit_ids),
                 type="replace",
-                location=CodeLocation(
+                location=CodeLocation.model_construct(
                     file_path="unknown",
-                    line_start=1,
-                    line_end=1
+                    line_start=line_start,
+                    line_end=line_end
                 ),
                 original_content=recommendation.original_code,
                 new_content=recommendation.suggested_code,
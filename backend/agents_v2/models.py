@@ -1,11 +1,17 @@
 """Pydantic models for type-safe agent operations."""
 
-from typing import List, Optional, Dict, Any, Literal
-from pydantic import BaseModel, Field
+import hashlib
+from bisect import bisect_right
+from typing import List, Optional, Dict, Any, FrozenSet, Literal
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, computed_field
 from datetime import datetime
 from enum import Enum
 
 
+# Config for value models that are built in bulk and never changed afterwards
+_FROZEN = ConfigDict(frozen=True, extra="forbid")
+
+
 class SeverityLevel(str, Enum):
     """Issue severity levels."""
     CRITICAL = "critical"
@@ -28,6 +34,8 @@ class IssueCategory(str, Enum):
 
 class CodeLocation(BaseModel):
     """Represents a location in code."""
+    model_config = _FROZEN
+    
     file_path: str = Field(..., description="Path to the file")
     line_start: int = Field(..., description="Starting line number")
     line_end: Optional[int] = Field(None, description="Ending line number")
@@ -41,10 +49,23 @@ class CodeContext(BaseModel):
     language: str = Field(..., description="Programming language")
     file_path: Optional[str] = Field(None, description="File path if available")
     project_context: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional project context")
+    
+    _digest: Optional[str] = PrivateAttr(None)
+    _digest_code: Optional[str] = PrivateAttr(None)
+    
+    @property
+    def code_digest(self) -> str:
+        """SHA-256 hex digest of the code, computed once per code string."""
+        if self._digest_code is not self.code:
+            self._digest = hashlib.sha256(self.code.encode()).hexdigest()
+            self._digest_code = self.code
+        return self._digest
 
 
 class CodeIssue(BaseModel):
     """Represents a code issue detected by analysis."""
+    model_config = _FROZEN
+    
     id: str = Field(..., description="Unique issue identifier")
     title: str = Field(..., description="Brief issue title")
     description: str = Field(..., description="Detailed issue description")
@@ -57,10 +78,13 @@ class CodeIssue(BaseModel):
     confidence: float = Field(0.0, ge=0.0, le=1.0, description="Confidence score")
     detected_by: str = Field(..., description="Agent that detected the issue")
     detected_at: datetime = Field(default_factory=datetime.now)
+    tags: FrozenSet[str] = Field(default_factory=frozenset, exclude=True, description="Fix dispatch tags set at detection time")
 
 
 class CodeRecommendation(BaseModel):
     """Represents a fix recommendation for a code issue."""
+    model_config = _FROZEN
+    
     issue_id: str = Field(..., description="Related issue ID")
     title: str = Field(..., description="Recommendation title")
     description: str = Field(..., description="Detailed explanation")
@@ -72,10 +96,15 @@ class CodeRecommendation(BaseModel):
     requires_review: bool = Field(True, description="Requires user review")
     impact: Literal["safe", "moderate", "risky"] = Field("moderate", description="Impact level of the fix")
     alternative_fixes: List[str] = Field(default_factory=list, description="Alternative fix suggestions")
+    line_start: Optional[int] = Field(None, description="First line of original_code in the source")
+    line_end: Optional[int] = Field(None, description="Last line of original_code in the source")
 
 
 class EditOperation(BaseModel):
     """Represents a code edit operation."""
+    # Not frozen: the editor marks operations applied in place
+    model_config = ConfigDict(extra="forbid")
+    
     id: str = Field(..., description="Operation ID")
     type: Literal["replace", "insert", "delete", "move"] = Field(..., description="Edit type")
     location: CodeLocation = Field(..., description="Edit location")
@@ -89,6 +118,8 @@ class EditOperation(BaseModel):
 
 class ValidationResult(BaseModel):
     """Result of code validation after applying fixes."""
+    model_config = _FROZEN
+    
     valid: bool = Field(..., description="Whether the code is valid")
     syntax_valid: bool = Field(True, description="Syntax validity")
     semantic_valid: bool = Field(True, description="Semantic validity")
@@ -123,6 +154,68 @@ class AgentResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class LineBuffer:
+    """Line-oriented backing store for the code in an edit session.
+    
+    Edits splice line lists in place; the joined text and line start
+    offsets are only rebuilt when they are next read.
+    """
+    
+    __slots__ = ("_lines", "_text", "_offsets")
+    
+    def __init__(self, text: str = ""):
+        self._lines = text.split('\n')
+        self._text = text
+        self._offsets = None
+    
+    def __len__(self) -> int:
+        return len(self._lines)
+    
+    def __iter__(self):
+        return iter(self._lines)
+    
+    def __getitem__(self, index):
+        return self._lines[index]
+    
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the buffer."""
+        return len(self._lines)
+    
+    def insert(self, index: int, text: str) -> None:
+        """Insert text (possibly several lines) before line ``index``."""
+        self.replace_range(index, index, text.split('\n'))
+    
+    def delete(self, start: int, end: int) -> List[str]:
+        """Delete lines ``start:end`` and return them."""
+        return self.replace_range(start, end, [])
+    
+    def replace_range(self, start: int, end: int, lines: List[str]) -> List[str]:
+        """Replace lines ``start:end`` with ``lines`` and return the old lines."""
+        old_lines = self._lines[start:end]
+        self._lines[start:end] = lines
+        self._text = None
+        self._offsets = None
+        return old_lines
+    
+    def to_string(self) -> str:
+        """Joined text, cached until the next edit."""
+        if self._text is None:
+            self._text = '\n'.join(self._lines)
+        return self._text
+    
+    def line_at(self, offset: int) -> int:
+        """Index of the line containing character ``offset`` of ``to_string()``."""
+        if self._offsets is None:
+            offsets = []
+            position = 0
+            for line in self._lines:
+                offsets.append(position)
+                position += len(line) + 1
+            self._offsets = offsets
+        return max(bisect_right(self._offsets, offset) - 1, 0)
+
+
 class EditSession(BaseModel):
     """Represents an interactive editing session."""
     session_id: str = Field(..., description="Unique session ID")
@@ -131,7 +224,44 @@ class EditSession(BaseModel):
     pending_edits: List[EditOperation] = Field(default_factory=list, description="Pending edits")
     undo_stack: List[EditOperation] = Field(default_factory=list, description="Undo history")
     redo_stack: List[EditOperation] = Field(default_factory=list, description="Redo history")
-    current_code: str = Field(..., description="Current state of the code")
     validation_status: Optional[ValidationResult] = Field(None)
     created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.now)
+    
+    _buffer: LineBuffer = PrivateAttr()
+    _original_lines: Optional[List[str]] = PrivateAttr(None)
+    
+    def __init__(self, current_code: str, **data):
+        super().__init__(**data)
+        self._buffer = LineBuffer(current_code)
+    
+    def __copy__(self):
+        """Copy the session with a line buffer of its own.
+        
+        Private attributes are otherwise copied shallowly (model_copy() and
+        copy.copy()), so edits to the copy would change this session's code.
+        """
+        copied = super().__copy__()
+        copied._buffer = LineBuffer(self._buffer.to_string())
+        return copied
+    
+    @property
+    def buffer(self) -> LineBuffer:
+        """Line buffer holding the current code."""
+        return self._buffer
+    
+    @property
+    def original_lines(self) -> List[str]:
+        """Lines of the original code, split once per session."""
+        if self._original_lines is None:
+            self._original_lines = self.code_context.code.split('\n')
+        return self._original_lines
+    
+    @computed_field(description="Current state of the code")
+    @property
+    def current_code(self) -> str:
+        return self._buffer.to_string()
+    
+    @current_code.setter
+    def current_code(self, value: str) -> None:
+        self._buffer = LineBuffer(value)
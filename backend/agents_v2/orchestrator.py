@@ -1,10 +1,20 @@
 """Agent orchestrator for coordinating multiple AI agents with streaming support."""
 
+import os
+import json
+import time
 import asyncio
 import logging
-from typing import List, Dict, Any, AsyncGenerator, Optional
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, AsyncGenerator, Awaitable, Callable, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .models import (
     CodeContext,
     AnalysisResult,
@@ -12,6 +22,7 @@ from .models import (
     CodeRecommendation,
     AgentResponse
 )
+from .base_agent import get_agent, reissue_issues
 from .code_analyzer_agent import CodeAnalyzerAgent
 from .security_agent import SecurityAnalysisAgent
 from .performance_agent import PerformanceAnalysisAgent
@@ -20,6 +31,86 @@ from .editor_agent import CodeEditorAgent
 
 logger = logging.getLogger(__name__)
 
+# Complete analysis results memoized by model, options and code (LRU-bounded)
+_RESULT_CACHE: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+_RESULT_CACHE_SIZE = int(os.getenv("AGENT_RESULT_CACHE_SIZE", "256"))
+
+# Updates buffered between the analysis pipeline and a streaming consumer
+_STREAM_QUEUE_SIZE = int(os.getenv("AGENT_STREAM_QUEUE_SIZE", "64"))
+
+# Encode streamed updates with orjson when it is installed
+ORCHESTRATOR_USE_ORJSON = ORJSON_AVAILABLE and os.getenv("ORCHESTRATOR_USE_ORJSON", "1") == "1"
+
+# Severities listed in the summary, most severe first
+_SUMMARY_SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+# Score penalty per issue by severity; unknown severities cost 5
+_SEVERITY_PENALTY = {
+    'critical': 25,
+    'high': 15,
+    'medium': 10,
+    'low': 5,
+    'info': 2
+}
+
+
+def _json_default(value: Any) -> str:
+    """Encode values json cannot, writing datetimes in ISO format like orjson."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_event(update: Dict[str, Any]) -> bytes:
+    """Encode a streamed analysis update as JSON.
+    
+    The analysis_complete update carries its result already encoded under
+    "result_json"; it is spliced into the output as "result" instead of
+    being decoded and encoded again.
+    
+    Args:
+        update: Update yielded by analyze_code_streaming
+        
+    Returns:
+        UTF-8 JSON of the update
+    """
+    result_json = update.get("result_json")
+    if result_json is not None:
+        update = {key: value for key, value in update.items() if key != "result_json"}
+    
+    if ORCHESTRATOR_USE_ORJSON:
+        encoded = orjson.dumps(update, default=str)
+    else:
+        encoded = json.dumps(update, default=_json_default, separators=(",", ":")).encode()
+    
+    if result_json is None:
+        return encoded
+    # Replace the closing brace with the spliced-in result
+    return encoded[:-1] + b',"result":' + result_json.encode() + b'}'
+
+
+def _encode_result(
+    result: AnalysisResult,
+    issue_payloads: List[Dict[str, Any]],
+    recommendation_payloads: List[Dict[str, Any]]
+) -> str:
+    """Encode an analysis result, reusing issues and recommendations already serialized.
+    
+    Args:
+        result: Analysis result
+        issue_payloads: JSON-mode dumps of result.issues, in order
+        recommendation_payloads: JSON-mode dumps of result.recommendations, in order
+        
+    Returns:
+        JSON of the result
+    """
+    payload = result.model_dump(mode="json", exclude={"issues", "recommendations"})
+    payload["issues"] = issue_payloads
+    payload["recommendations"] = recommendation_payloads
+    if ORCHESTRATOR_USE_ORJSON:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload, separators=(",", ":"))
+
 
 class AgentOrchestrator:
     """Orchestrates multiple AI agents for comprehensive code analysis."""
@@ -34,17 +125,52 @@ class AgentOrchestrator:
         self.async_azure_client = async_azure_client
         self.model_name = model_name
         
-        # Initialize all analysis agents with async Azure client
+        # Reuse pooled agents sharing the async Azure client
         self.agents = {
-            'code_analyzer': CodeAnalyzerAgent(async_azure_client, model_name),
-            'security_agent': SecurityAnalysisAgent(async_azure_client, model_name),
-            'performance_agent': PerformanceAnalysisAgent(async_azure_client, model_name),
-            'fix_agent': CodeFixAgent(async_azure_client, model_name),
-            'editor_agent': CodeEditorAgent(async_azure_client, model_name)
+            'code_analyzer': get_agent(CodeAnalyzerAgent, async_azure_client, model_name),
+            'security_agent': get_agent(SecurityAnalysisAgent, async_azure_client, model_name),
+            'performance_agent': get_agent(PerformanceAnalysisAgent, async_azure_client, model_name),
+            'fix_agent': get_agent(CodeFixAgent, async_azure_client, model_name),
+            'editor_agent': get_agent(CodeEditorAgent, async_azure_client, model_name)
         }
         
+        # Agents run for every analysis, in pipeline order, and how many
+        # agents report on one (all but the interactive editor); both fixed
+        # for the orchestrator
+        self._analysis_agent_list = (
+            self.agents['code_analyzer'],
+            self.agents['security_agent'],
+            self.agents['performance_agent']
+        )
+        self._reporting_agent_count = sum(
+            1 for agent in self.agents.values() if agent.name != "Interactive Code Editor"
+        )
+        
+        # Bound concurrent agent runs against the shared Azure deployment
+        self._agent_semaphore = asyncio.Semaphore(int(os.getenv("AGENT_MAX_CONCURRENCY", "3")))
+        
         logger.info(f"Initialized orchestrator with {len(self.agents)} agents using AsyncAzureOpenAI")
     
+    async def _run_agent(self, agent, context: CodeContext) -> AgentResponse:
+        """Run one analysis agent under the concurrency limit.
+        
+        Failures are returned as unsuccessful responses rather than raised,
+        so one agent never cancels the others.
+        
+        Args:
+            agent: Agent to run
+            context: Code context to analyze
+            
+        Returns:
+            Agent response
+        """
+        async with self._agent_semaphore:
+            try:
+                return await agent.analyze(context)
+            except Exception as e:
+                logger.error(f"Agent {agent.name} failed: {e}")
+                return AgentResponse(agent_name=agent.name, success=False, error=str(e))
+    
     async def analyze_code_streaming(
         self,
         context: CodeContext,
@@ -57,115 +183,235 @@ class AgentOrchestrator:
             include_recommendations: Whether to generate fix recommendations
             
         Yields:
-            Streaming analysis updates
+            Streaming analysis updates. The analysis_complete update carries
+            the result as a pre-encoded JSON string under "result_json".
+        """
+        updates: asyncio.Queue = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+        
+        async def _produce():
+            try:
+                await self._run_pipeline(context, include_recommendations, updates.put)
+            finally:
+                # None marks the end of the stream; nobody reads it once cancelled
+                if not asyncio.current_task().cancelling():
+                    await updates.put(None)
+        
+        pipeline = asyncio.create_task(_produce())
+        
+        try:
+            while (update := await updates.get()) is not None:
+                yield update
+            # Surface a pipeline failure to the consumer
+            await pipeline
+        finally:
+            # Stop the pipeline if the consumer stops reading early
+            pipeline.cancel()
+    
+    async def _run_pipeline(
+        self,
+        context: CodeContext,
+        include_recommendations: bool,
+        on_update: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> AnalysisResult:
+        """Run the analysis pipeline.
+        
+        Update payloads are only built when on_update is given, so callers
+        that just need the result skip serializing every issue.
+        
+        Args:
+            context: Code context to analyze
+            include_recommendations: Whether to generate fix recommendations
+            on_update: Coroutine function receiving each streaming update (optional)
+            
+        Returns:
+            Complete analysis result
         """
+        t0 = time.perf_counter()
         start_time = datetime.now()
         analysis_id = f"analysis_{int(start_time.timestamp())}"
         
+        cache_key = self._result_cache_key(context, include_recommendations)
+        cached = _RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            _RESULT_CACHE.move_to_end(cache_key)
+            logger.info("[ORCHESTRATOR] ⚡ Cache hit - reusing previous analysis")
+            result = self._reissue_result(cached, analysis_id, time.perf_counter() - t0)
+            if on_update:
+                await on_update({
+                    "type": "analysis_complete",
+                    "analysis_id": analysis_id,
+                    "result_json": result.model_dump_json(),
+                    "total_time": result.analysis_time_seconds,
+                    "cached": True
+                })
+            return result
+        
         # Send initial status
-        yield {
-            "type": "status",
-            "analysis_id": analysis_id,
-            "status": "started",
-            "timestamp": start_time.isoformat(),
-            "total_agents": len([a for a in self.agents.values() if a.name != "Interactive Code Editor"])
-        }
+        if on_update:
+            await on_update({
+                "type": "status",
+                "analysis_id": analysis_id,
+                "status": "started",
+                "timestamp": start_time.isoformat(),
+                "total_agents": self._reporting_agent_count
+            })
         
         all_issues = []
         all_recommendations = []
         agent_results = {}
+        incomplete = False
         
-        # Run analysis agents concurrently with streaming updates
-        analysis_agents = ['code_analyzer', 'security_agent', 'performance_agent']
+        # Run analysis agents concurrently
+        analysis_agents = self._analysis_agent_list
         
-        for i, agent_name in enumerate(analysis_agents):
-            agent = self.agents[agent_name]
-            
-            yield {
-                "type": "agent_start",
-                "analysis_id": analysis_id,
-                "agent": agent.name,
-                "progress": (i / len(analysis_agents)) * 100
-            }
+        for i, agent in enumerate(analysis_agents):
+            logger.info(f"[ORCHESTRATOR] Agent '{agent.name}' starting...")
+            if on_update:
+                await on_update({
+                    "type": "agent_start",
+                    "analysis_id": analysis_id,
+                    "agent": agent.name,
+                    "progress": (i / len(analysis_agents)) * 100
+                })
+        
+        # Each agent reports from its own task as soon as it finishes, so
+        # one agent's events never wait on another; issues are gathered per
+        # agent so the final result keeps the agent order
+        issues_by_agent = [None] * len(analysis_agents)
+        agent_errors = {}
+        finished = 0
+        succeeded = 0
+        
+        async def _run_and_report(index: int, agent):
+            nonlocal finished, succeeded, incomplete
+            response = await self._run_agent(agent, context)
+            finished += 1
+            progress = (finished / len(analysis_agents)) * 100
             
-            try:
-                # Run agent analysis
-                response = await agent.analyze(context)
+            if response.success:
+                # A successful agent with no findings still completes cleanly
+                succeeded += 1
+                issues = response.data if isinstance(response.data, list) else []
+                # Serialize each issue once; the final result reuses it
+                payloads = [issue.model_dump(mode="json") for issue in issues] if on_update else None
+                issues_by_agent[index] = (agent.name, issues, payloads)
+                logger.info(f"[ORCHESTRATOR] Agent '{agent.name}' completed: {len(issues)} issues in {response.processing_time:.2f}s")
                 
-                if response.success and response.data:
-                    issues = response.data if isinstance(response.data, list) else []
-                    all_issues.extend(issues)
-                    agent_results[agent.name] = len(issues)
-                    
+                if on_update:
                     # Stream individual issues as they're found
-                    for issue in issues:
-                        yield {
+                    for payload in payloads:
+                        await on_update({
                             "type": "issue_found",
                             "analysis_id": analysis_id,
                             "agent": agent.name,
-                            "issue": issue.dict()
-                        }
+                            "issue": payload
+                        })
                     
-                    yield {
+                    await on_update({
                         "type": "agent_complete",
                         "analysis_id": analysis_id,
                         "agent": agent.name,
                         "issues_found": len(issues),
                         "processing_time": response.processing_time,
-                        "progress": ((i + 1) / len(analysis_agents)) * 100
-                    }
-                else:
-                    yield {
+                        "progress": progress
+                    })
+            else:
+                incomplete = True
+                agent_errors[agent.name] = response.error
+                if on_update:
+                    await on_update({
                         "type": "agent_error",
                         "analysis_id": analysis_id,
                         "agent": agent.name,
                         "error": response.error,
-                        "progress": ((i + 1) / len(analysis_agents)) * 100
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Agent {agent.name} failed: {e}")
-                yield {
-                    "type": "agent_error",
+                        "progress": progress
+                    })
+        
+        async with asyncio.TaskGroup() as tg:
+            for index, agent in enumerate(analysis_agents):
+                tg.create_task(_run_and_report(index, agent))
+        
+        # Nothing to score or fix when every agent failed
+        if not succeeded:
+            analysis_time = time.perf_counter() - t0
+            logger.error(f"[ORCHESTRATOR] All {len(analysis_agents)} agents failed")
+            if on_update:
+                await on_update({
+                    "type": "analysis_failed",
                     "analysis_id": analysis_id,
-                    "agent": agent.name,
-                    "error": str(e),
-                    "progress": ((i + 1) / len(analysis_agents)) * 100
-                }
+                    "errors": agent_errors,
+                    "total_time": analysis_time
+                })
+            return AnalysisResult(
+                id=analysis_id,
+                context=context,
+                overall_score=0,
+                summary="Analysis failed",
+                analyzed_by=[],
+                analysis_time_seconds=analysis_time
+            )
+        
+        # Bind the accumulator methods once for the merge loop
+        issue_payloads = []
+        extend_issues = all_issues.extend
+        extend_payloads = issue_payloads.extend
+        set_agent_result = agent_results.__setitem__
+        for entry in issues_by_agent:
+            if entry is not None:
+                agent_name, issues, payloads = entry
+                extend_issues(issues)
+                if payloads:
+                    extend_payloads(payloads)
+                set_agent_result(agent_name, len(issues))
+        recommendation_payloads = []
         
         # Generate recommendations if requested
         if include_recommendations and all_issues:
-            yield {
-                "type": "status",
-                "analysis_id": analysis_id,
-                "status": "generating_recommendations",
-                "issues_found": len(all_issues)
-            }
+            if on_update:
+                await on_update({
+                    "type": "status",
+                    "analysis_id": analysis_id,
+                    "status": "generating_recommendations",
+                    "issues_found": len(all_issues)
+                })
             
             fix_agent = self.agents['fix_agent']
             
-            for i, issue in enumerate(all_issues):
-                try:
-                    recommendation = await fix_agent.generate_fix(issue, context)
+            # Stream recommendations as they complete; keep them by issue
+            # index so the final result lists them in issue order
+            recommendations = [None] * len(all_issues)
+            rec_payloads = [None] * len(all_issues)
+            
+            try:
+                done = 0
+                async for index, recommendation in fix_agent.iter_recommendations(all_issues, context):
+                    done += 1
                     if recommendation:
-                        all_recommendations.append(recommendation)
+                        recommendations[index] = recommendation
                         
-                        yield {
-                            "type": "recommendation_generated",
-                            "analysis_id": analysis_id,
-                            "recommendation": recommendation.dict(),
-                            "progress": ((i + 1) / len(all_issues)) * 100
-                        }
-                        
-                except Exception as e:
-                    logger.error(f"Failed to generate recommendation for issue {issue.id}: {e}")
+                        if on_update:
+                            # Serialize each recommendation once; the final result reuses it
+                            rec_payloads[index] = recommendation.model_dump(mode="json")
+                            await on_update({
+                                "type": "recommendation_generated",
+                                "analysis_id": analysis_id,
+                                "recommendation": rec_payloads[index],
+                                "progress": (done / len(all_issues)) * 100
+                            })
+            except Exception as e:
+                logger.error(f"Failed to generate recommendations: {e}")
+                incomplete = True
+            
+            all_recommendations = [rec for rec in recommendations if rec]
+            recommendation_payloads = [payload for payload in rec_payloads if payload]
         
         # Calculate overall score
-        overall_score = self._calculate_score(all_issues)
+        severity_counts, category_counts = self._aggregate_issues(all_issues)
+        overall_score = self._calculate_score(severity_counts)
         
         # Generate summary
-        analysis_time = (datetime.now() - start_time).total_seconds()
-        summary = self._generate_summary(all_issues, agent_results, analysis_time)
+        analysis_time = time.perf_counter() - t0
+        summary = self._generate_summary(severity_counts, category_counts, analysis_time)
         
         # Create final result
         result = AnalysisResult(
@@ -184,13 +430,30 @@ class AgentOrchestrator:
             }
         )
         
-        # Send final result
-        yield {
-            "type": "analysis_complete",
-            "analysis_id": analysis_id,
-            "result": result.dict(),
-            "total_time": analysis_time
-        }
+        # Model failures mark the analysis incomplete, so any complete analysis,
+        # even a clean one, is safe to reuse
+        if not incomplete:
+            # Cache a copy of the lists, so callers changing theirs cannot alter it
+            _RESULT_CACHE[cache_key] = result.model_copy(update={
+                "issues": list(all_issues),
+                "recommendations": list(all_recommendations),
+                "analyzed_by": list(result.analyzed_by),
+                "metadata": dict(result.metadata)
+            })
+            if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+                _RESULT_CACHE.popitem(last=False)
+        
+        # Send final result pre-encoded, reusing the issue and recommendation
+        # payloads already streamed; transports splice it in without re-encoding
+        if on_update:
+            await on_update({
+                "type": "analysis_complete",
+                "analysis_id": analysis_id,
+                "result_json": _encode_result(result, issue_payloads, recommendation_payloads),
+                "total_time": analysis_time
+            })
+        
+        return result
     
     async def analyze_code(
         self,
@@ -206,32 +469,16 @@ class AgentOrchestrator:
         Returns:
             Complete analysis result
         """
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         logger.info(f"[ORCHESTRATOR] Starting code analysis for {context.language} code ({len(context.code)} chars)")
         
-        # Collect all streaming results
-        final_result = None
-        
-        async for update in self.analyze_code_streaming(context, include_recommendations):
-            if update["type"] == "agent_start":
-                logger.info(f"[ORCHESTRATOR] Agent '{update['agent']}' starting...")
-            elif update["type"] == "agent_complete":
-                logger.info(f"[ORCHESTRATOR] Agent '{update['agent']}' completed: {update['issues_found']} issues in {update['processing_time']:.2f}s")
-            elif update["type"] == "analysis_complete":
-                final_result = AnalysisResult(**update["result"])
-                break
+        # Run the pipeline directly; no updates are built without a consumer
+        final_result = await self._run_pipeline(context, include_recommendations)
         
-        total_time = time.time() - start_time
+        total_time = time.perf_counter() - start_time
         logger.info(f"[ORCHESTRATOR] ✅ Analysis complete in {total_time*1000:.2f}ms")
         
-        return final_result or AnalysisResult(
-            id="error",
-            context=context,
-            summary="Analysis failed",
-            analyzed_by=[],
-            analysis_time_seconds=0
-        )
+        return final_result
     
     async def apply_recommendations(
         self,
@@ -258,32 +505,30 @@ class AgentOrchestrator:
         results = []
         applied_count = 0
         
-        for recommendation in recommendations:
-            try:
-                result = await editor_agent.apply_recommendation(session_id, recommendation)
-                results.append({
-                    "recommendation_id": recommendation.issue_id,
-                    "success": result.get("success", False),
-                    "error": result.get("error")
-                })
-                
-                if result.get("success"):
-                    applied_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Failed to apply recommendation {recommendation.issue_id}: {e}")
-                results.append({
-                    "recommendation_id": recommendation.issue_id,
-                    "success": False,
-                    "error": str(e)
-                })
+        # Edits are applied in order and the session is validated once at the end
+        try:
+            edit_results = await editor_agent.apply_recommendations_batch(session_id, recommendations)
+        except Exception as e:
+            logger.error(f"Failed to apply recommendations: {e}")
+            edit_results = [{"error": str(e)} for _ in recommendations]
+        
+        for recommendation, result in zip(recommendations, edit_results):
+            results.append({
+                "recommendation_id": recommendation.issue_id,
+                "success": result.get("success", False),
+                "error": result.get("error")
+            })
+            
+            if result.get("success"):
+                applied_count += 1
         
         # Get final code and diff
         final_code = None
         diff = None
         
-        if session_id in editor_agent.active_sessions:
-            final_code = editor_agent.active_sessions[session_id].current_code
+        session = editor_agent.active_sessions.get(session_id)
+        if session is not None:
+            final_code = session.current_code
             diff = await editor_agent.get_session_diff(session_id)
         
         return {
@@ -319,10 +564,10 @@ class AgentOrchestrator:
         """
         editor_agent = self.agents['editor_agent']
         
-        if session_id not in editor_agent.active_sessions:
+        session = editor_agent.active_sessions.get(session_id)
+        if session is None:
             return None
         
-        session = editor_agent.active_sessions[session_id]
         diff = await editor_agent.get_session_diff(session_id)
         
         return {
@@ -338,30 +583,81 @@ class AgentOrchestrator:
             "diff": diff
         }
     
-    def _calculate_score(self, issues: List[CodeIssue]) -> int:
-        """Calculate overall code quality score.
+    def _result_cache_key(self, context: CodeContext, include_recommendations: bool) -> str:
+        """Build the memoization key for a complete analysis.
+        
+        Args:
+            context: Code context to analyze
+            include_recommendations: Whether fix recommendations are included
+            
+        Returns:
+            Key of model, options, language, file path and the code's digest
+        """
+        # The file path is part of every issue location, so it keys too
+        return f"{self.model_name}|{include_recommendations}|{context.language}|{context.file_path}|{context.code_digest}"
+    
+    def _reissue_result(self, cached: AnalysisResult, analysis_id: str, analysis_time: float) -> AnalysisResult:
+        """Copy a cached analysis as a new analysis for a cache hit.
+        
+        Issues get fresh ids, and recommendations follow their issues, so
+        separate analyses never share ids or mutable state.
+        
+        Args:
+            cached: Cached analysis result
+            analysis_id: ID of the new analysis
+            analysis_time: Time taken to serve the hit
+            
+        Returns:
+            New analysis result
+        """
+        issues = reissue_issues(cached.issues)
+        issue_id_map = {old.id: new.id for old, new in zip(cached.issues, issues)}
+        recommendations = [
+            rec.model_copy(update={"issue_id": issue_id_map.get(rec.issue_id, rec.issue_id)})
+            for rec in cached.recommendations
+        ]
+        return cached.model_copy(update={
+            "id": analysis_id,
+            "issues": issues,
+            "recommendations": recommendations,
+            "analyzed_by": list(cached.analyzed_by),
+            "analysis_time_seconds": analysis_time,
+            "created_at": datetime.now(),
+            "metadata": {**cached.metadata, "cached": True}
+        })
+    
+    def _aggregate_issues(self, issues: List[CodeIssue]) -> Tuple[Counter, Counter]:
+        """Count issues by severity and by category in one pass.
         
         Args:
             issues: List of issues found
             
+        Returns:
+            Tuple of (severity counts, category counts) keyed by enum value
+        """
+        severity_counts = Counter()
+        category_counts = Counter()
+        
+        for issue in issues:
+            severity_counts[issue.severity.value] += 1
+            category_counts[issue.category.value] += 1
+        
+        return severity_counts, category_counts
+    
+    def _calculate_score(self, severity_counts: Counter) -> int:
+        """Calculate overall code quality score.
+        
+        Args:
+            severity_counts: Issue counts by severity
+            
         Returns:
             Score from 0-100
         """
-        if not issues:
+        if not severity_counts:
             return 100
         
-        # Penalty weights by severity
-        penalties = {
-            'critical': 25,
-            'high': 15,
-            'medium': 10,
-            'low': 5,
-            'info': 2
-        }
-        
-        total_penalty = 0
-        for issue in issues:
-            total_penalty += penalties.get(issue.severity.value, 5)
+        # Weigh each distinct severity once
+        total_penalty = sum(_SEVERITY_PENALTY.get(severity, 5) * count for severity, count in severity_counts.items())
         
         # Cap the penalty to ensure score doesn't go below 0
         score = max(0, 100 - total_penalty)
@@ -369,54 +665,47 @@ class AgentOrchestrator:
     
     def _generate_summary(
         self,
-        issues: List[CodeIssue],
-        agent_results: Dict[str, int],
+        severity_counts: Counter,
+        category_counts: Counter,
         analysis_time: float
     ) -> str:
         """Generate human-readable analysis summary.
         
         Args:
-            issues: List of issues found
-            agent_results: Results by agent
+            severity_counts: Issue counts by severity
+            category_counts: Issue counts by category
             analysis_time: Analysis duration
             
         Returns:
             Summary text
         """
-        if not issues:
+        issue_count = sum(severity_counts.values())
+        if not issue_count:
             return f"Code analysis completed in {analysis_time:.1f}s. No issues found - excellent code quality!"
         
-        severity_counts = {}
-        category_counts = {}
-        
-        for issue in issues:
-            severity = issue.severity.value
-            category = issue.category.value
-            
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
         # Build summary
         summary_parts = []
         
         # Overall stats
         summary_parts.append(f"Analysis completed in {analysis_time:.1f}s")
-        summary_parts.append(f"Found {len(issues)} issues across {len(category_counts)} categories")
+        summary_parts.append(f"Found {issue_count} issues across {len(category_counts)} categories")
         
         # Severity breakdown
         if severity_counts:
-            severity_text = []
-            for severity in ['critical', 'high', 'medium', 'low']:
-                count = severity_counts.get(severity, 0)
-                if count > 0:
-                    severity_text.append(f"{count} {severity}")
+            # Counter returns 0 for absent severities
+            severity_text = [
+                f"{severity_counts[severity]} {severity}"
+                for severity in _SUMMARY_SEVERITIES
+                if severity_counts[severity]
+            ]
             
             if severity_text:
                 summary_parts.append(f"Severity: {', '.join(severity_text)}")
         
         # Top categories
         if category_counts:
-            top_categories = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+            # most_common(n) is heapq.nlargest over the counts, ties kept in insertion order
+            top_categories = category_counts.most_common(3)
             cat_text = [f"{count} {cat.replace('_', ' ')}" for cat, count in top_categories]
             summary_parts.append(f"Main areas: {', '.join(cat_text)}")
         
@@ -1,13 +1,30 @@
 """Performance optimization agent using Pydantic AI."""
 
+import os
 import re
-import uuid
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import multiprocessing
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Tuple
 
 from pydantic_ai import RunContext
 
-from .base_agent import BaseCodeAgent
+# Older tree-sitter releases import but reject Language(<grammar>.language()),
+# so the parser is built here and any failure disables the syntax path
+try:
+    import tree_sitter_python
+    from tree_sitter import Language, Parser
+    _TS_PARSER = Parser(Language(tree_sitter_python.language()))
+    TREE_SITTER_AVAILABLE = True
+except Exception:
+    _TS_PARSER = None
+    TREE_SITTER_AVAILABLE = False
+
+from .base_agent import BaseCodeAgent, issue_ids, issue_tags
 from .models import (
     CodeContext,
     CodeIssue,
@@ -16,6 +33,405 @@ from .models import (
     IssueCategory
 )
 
+# Inputs at least this large are scanned in a worker process, off the event
+# loop; smaller ones scan faster than they would pickle
+_PROCESS_SCAN_MIN_CHARS = 64 * 1024
+_SCAN_WORKERS = int(os.getenv("AGENT_SCAN_WORKERS", "0")) or os.cpu_count()
+_SCAN_POOL: Optional[ProcessPoolExecutor] = None
+
+# Detector scans memoized by a digest of the code, so cached entries do not
+# pin the source itself (LRU-bounded)
+_SCAN_CACHE: "OrderedDict[bytes, Dict[str, Tuple[Dict[str, Any], ...]]]" = OrderedDict()
+_SCAN_CACHE_SIZE = int(os.getenv("AGENT_SCAN_CACHE_SIZE", "256"))
+
+# Issue ids for every analysis, drawing randomness in shared batches
+_issue_ids = issue_ids()
+
+# SeverityLevel by value, for building issues without validation
+_SEVERITY = {level.value: level for level in SeverityLevel}
+
+# Static detector rules: (pattern, description, severity). Patterns match
+# from the start of a line. Each piece but the last is found by an atomic
+# lazy scan, "(?>.*?piece)", which commits to its first occurrence; that
+# never loses a match of such in-order pieces, and keeps a failing line to
+# one forward scan per piece instead of quadratic ".*" backtracking.
+_LOOP_PATTERNS = (
+    (r'(?>.*?for)(?>.*?in).*?range\(len\(', "Using range(len()) instead of enumerate()", "medium"),
+    (r'(?>.*?\.append\()(?>.*?\))(?>.*?for).*?in', "List append in loop instead of list comprehension", "low"),
+    (r'(?>.*?for)(?>.*?in).*?\.keys\(\)', "Iterating over .keys() unnecessarily", "low"),
+    (r'(?>.*?for)(?>.*?in)(?>.*?\.items\(\)).*?\[0\]|.*?\[1\]', "Unpacking items inefficiently", "low"),
+    (r'(?>.*?while)(?>.*?len\()(?>.*?\)).*?>', "Inefficient while loop with len() check", "medium"),
+)
+
+_ALGORITHM_PATTERNS = (
+    (r'(?>.*?if)(?>.*?in).*?(?:list\(|\[)', "Using 'in' with list - O(n) operation", "medium"),
+    (r'(?>.*?\.sort\(\)).*?\.sort\(\)', "Multiple sorts - combine operations", "medium"),
+    (r'(?>.*?sorted\()(?>.*?reverse).*?sorted\(', "Multiple sorting operations", "medium"),
+    (r'(?>.*?len\().*?\)\s*[=!]=\s*0', "Use boolean evaluation instead of len()", "low"),
+    (r'(?>.*?sum\(\[)(?>.*?for)(?>.*?in).*?\]\)', "sum() with list comprehension - use generator", "low"),
+)
+
+# SQL rules of the database detector: (pattern, description, severity, type)
+_DB_PATTERNS = (
+    (r'.*?(?i:SELECT)\s+\*', "SELECT * can fetch unnecessary data", "low", "select_all"),
+)
+
+# Single-purpose detector patterns
+_GLOBAL_STATE_RE = re.compile(r'^[A-Z_]+\s*=.*\[\]|\{\}')
+
+# Line numbers in the model's issue blocks
+_LINE_FIELD_RE = re.compile(r'Line:\s*(\d+)')
+_LINE_ANYWHERE_RE = re.compile(r'(?:Line|line)[\s:]+(\d+)', re.IGNORECASE)
+
+# Appending to a string with += or s = s + ..., where the appended operands
+# include a string literal before any comment
+_STR_CONCAT = re.compile(r'\+=[^#\n]*?[\'"]|\b(\w+)\s*=\s*\1\b\s*\+[^#\n]*?[\'"]')
+
+# Assigning an empty list in a loop over a large literal range
+_LARGE_LIST_RE = re.compile(r'(?>.*?=\s*\[\s*\])(?>.*?for)(?>.*?in).*?range\([0-9]{4,}')
+
+# Words starting a loop, words suggesting a database call, and column
+# names suggesting an index
+_LOOP_KEYWORDS = ('for ', 'while ')
+_DB_KEYWORDS = ('SELECT', 'query', 'execute', 'fetch', 'find', 'get')
+_INDEX_HINTS = ('id', 'pk', 'primary')
+
+
+def _union_scanner(patterns) -> re.Pattern:
+    """Compile detector rules into one regex that reports every matching rule.
+    
+    Each rule becomes an optional lookahead ending in an empty named group,
+    so a single match() at the start of a line marks all rules found in it.
+    """
+    return re.compile("".join(
+        f"(?=(?:{pattern})(?P<rule{index}>))?"
+        for index, (pattern, *_) in enumerate(patterns)
+    ))
+
+
+# Every per-line rule of the shared pass, scanned in one match; the index
+# ranges map each hit back to the detector reporting it
+_LINE_RULES = _LOOP_PATTERNS + _ALGORITHM_PATTERNS + _DB_PATTERNS
+_LOOP_RULES = range(len(_LOOP_PATTERNS))
+_ALGORITHM_RULES = range(_LOOP_RULES.stop, _LOOP_RULES.stop + len(_ALGORITHM_PATTERNS))
+_DB_RULES = range(_ALGORITHM_RULES.stop, len(_LINE_RULES))
+_LINE_SCANNER = _union_scanner(_LINE_RULES)
+
+
+# Python syntax nodes that can hold statements, and so loops
+_TS_STATEMENT_CONTAINERS = frozenset((
+    "module", "block", "if_statement", "elif_clause", "else_clause",
+    "for_statement", "while_statement", "try_statement", "except_clause",
+    "except_group_clause", "finally_clause", "with_statement",
+    "function_definition", "class_definition", "decorated_definition",
+    "match_statement", "case_clause"
+))
+_TS_LOOPS = frozenset(("for_statement", "while_statement"))
+
+
+def _python_loop_rows(code: str) -> Optional[Tuple[set, set]]:
+    """Locate loops from the Python syntax tree.
+    
+    Only statement nodes are walked, so the cost follows the number of
+    statements rather than of expressions.
+    
+    Args:
+        code: Code to parse
+        
+    Returns:
+        1-based rows starting a loop nested in another, and rows inside a
+        loop body; None when tree-sitter is not installed or the code does
+        not parse as Python
+    """
+    if not TREE_SITTER_AVAILABLE:
+        return None
+    
+    root = _TS_PARSER.parse(code.encode()).root_node
+    if root.has_error:
+        return None
+    
+    nested_rows = set()
+    body_rows = set()
+    # (node, number of loops enclosing it)
+    pending = [(root, 0)]
+    while pending:
+        node, depth = pending.pop()
+        if node.type in _TS_LOOPS:
+            if depth:
+                nested_rows.add(node.start_point[0] + 1)
+            # Only the body runs per iteration; the else clause stays at
+            # the loop's own depth
+            body = node.child_by_field_name("body")
+            if body is not None:
+                body_rows.update(range(body.start_point[0] + 1, body.end_point[0] + 2))
+                pending.append((body, depth + 1))
+            pending.extend(
+                (child, depth) for child in node.named_children
+                if child.type in _TS_STATEMENT_CONTAINERS and child != body
+            )
+            continue
+        pending.extend(
+            (child, depth) for child in node.named_children
+            if child.type in _TS_STATEMENT_CONTAINERS
+        )
+    return nested_rows, body_rows
+
+
+def _lines_containing(code: str, line_starts: List[int], keywords) -> set:
+    """Find the lines containing any of the keywords.
+    
+    Each keyword is located with str.find over the whole code, so lines
+    without a hit are never visited.
+    
+    Args:
+        code: Code to search
+        line_starts: Offset of each line in the code
+        keywords: Substrings to look for (without newlines)
+        
+    Returns:
+        1-based numbers of the lines containing a keyword
+    """
+    found = set()
+    for keyword in keywords:
+        pos = code.find(keyword)
+        while pos != -1:
+            line_num = bisect_right(line_starts, pos)
+            found.add(line_num)
+            # Further hits on the same line add nothing; resume on the next
+            if line_num == len(line_starts):
+                break
+            pos = code.find(keyword, line_starts[line_num])
+    return found
+
+
+def _scan_performance(code: str) -> Dict[str, Tuple[Dict[str, Any], ...]]:
+    """Run all static performance detectors in a single pass over the lines.
+    
+    Args:
+        code: Code to analyze
+        
+    Returns:
+        Issues found by each detector, keyed "loops", "database", "memory"
+        and "algorithm"
+    """
+    lines = code.split('\n')
+    line_starts = [0, *accumulate(len(line) + 1 for line in lines[:-1])]
+    
+    # Lines holding the plain substrings the detectors test for
+    loop_lines = _lines_containing(code, line_starts, _LOOP_KEYWORDS)
+    db_lines = _lines_containing(code, line_starts, _DB_KEYWORDS)
+    where_lines = _lines_containing(code, line_starts, ('WHERE',))
+    read_lines = _lines_containing(code, line_starts, ('.read()', '.readlines()'))
+    
+    # Loop structure from the syntax tree for Python; other code falls back
+    # to tracking loops by indentation
+    loop_rows = _python_loop_rows(code)
+    if loop_rows is not None:
+        nested_rows, body_rows = loop_rows
+    
+    loop_issues = []
+    nested_issues = []
+    db_issues = []
+    memory_issues = []
+    algo_issues = []
+    
+    # Bind the bucket appends once for the per-line loop
+    add_loop_issue = loop_issues.append
+    add_nested_issue = nested_issues.append
+    add_db_issue = db_issues.append
+    add_memory_issue = memory_issues.append
+    add_algo_issue = algo_issues.append
+    
+    # Indents of the loops enclosing the current line
+    loop_stack = []
+    in_loop = False
+    loop_indent = 0
+    
+    for line_num, line in enumerate(lines, 1):
+        # One lstrip gives both the indent and, usually without a copy, the
+        # stripped line
+        lstripped = line.lstrip()
+        stripped = lstripped.rstrip()
+        indent = len(line) - len(lstripped)
+        is_loop_line = line_num in loop_lines
+        
+        # Run every line rule in one scan
+        match = _LINE_SCANNER.match(line)
+        hits = match.groups() if match.lastindex is not None else None
+        
+        # Patterns for inefficient loops
+        if hits:
+            for index in _LOOP_RULES:
+                if hits[index] is not None:
+                    _, description, severity = _LINE_RULES[index]
+                    add_loop_issue({
+                        "line": line_num,
+                        "description": description,
+                        "code": stripped,
+                        "severity": severity
+                    })
+        
+        if loop_rows is not None:
+            nested = line_num in nested_rows
+            in_loop = in_loop_body = line_num in body_rows
+        else:
+            # Leave the loops this line is not indented under
+            if stripped:
+                while loop_stack and loop_stack[-1] >= indent:
+                    loop_stack.pop()
+            nested = is_loop_line and bool(loop_stack)
+            if is_loop_line:
+                loop_stack.append(indent)
+            in_loop_body = bool(loop_stack) and not is_loop_line
+            
+            # N+1 query pattern detection: check if we're entering a loop
+            if is_loop_line:
+                in_loop = True
+                loop_indent = indent
+            elif in_loop and indent <= loop_indent:
+                in_loop = False
+        
+        # Check for nested loops (O(n²) or worse)
+        if nested:
+            add_nested_issue({
+                "line": line_num,
+                "description": "Nested loop detected - potential O(n²) complexity",
+                "code": stripped,
+                "severity": "high"
+            })
+        
+        # Check for queries inside loops
+        if in_loop and line_num in db_lines:
+            add_db_issue({
+                "line": line_num,
+                "type": "n_plus_one",
+                "description": "Database query inside loop - potential N+1 problem",
+                "severity": "high"
+            })
+        
+        # Check for missing indexes
+        if line_num in where_lines and not any(idx in line for idx in _INDEX_HINTS):
+            add_db_issue({
+                "line": line_num,
+                "type": "missing_index",
+                "description": "Query without apparent index usage",
+                "severity": "medium"
+            })
+        
+        # Check for SELECT *
+        if hits:
+            for index in _DB_RULES:
+                if hits[index] is not None:
+                    _, description, severity, issue_type = _LINE_RULES[index]
+                    add_db_issue({
+                        "line": line_num,
+                        "type": issue_type,
+                        "description": description,
+                        "severity": severity
+                    })
+        
+        # Large data structure creation
+        if _LARGE_LIST_RE.match(line):
+            add_memory_issue({
+                "line": line_num,
+                "description": "Creating large list - consider generator",
+                "severity": "high"
+            })
+        
+        # Reading entire file into memory
+        if line_num in read_lines:
+            add_memory_issue({
+                "line": line_num,
+                "description": "Reading entire file into memory - consider streaming",
+                "severity": "medium"
+            })
+        
+        # String concatenation anywhere inside a loop body
+        if in_loop_body and _STR_CONCAT.search(line):
+            add_memory_issue({
+                "line": line_num,
+                "description": "String concatenation in loop - use join() or list",
+                "severity": "medium"
+            })
+        
+        # Global variables that could be large
+        if _GLOBAL_STATE_RE.match(stripped):
+            add_memory_issue({
+                "line": line_num,
+                "description": "Global mutable state - potential memory leak",
+                "severity": "low"
+            })
+        
+        # Check for inefficient operations
+        if hits:
+            for index in _ALGORITHM_RULES:
+                if hits[index] is not None:
+                    _, description, severity = _LINE_RULES[index]
+                    add_algo_issue({
+                        "line": line_num,
+                        "description": description,
+                        "severity": severity
+                    })
+    
+    return {
+        "loops": tuple(loop_issues + nested_issues),
+        "database": tuple(db_issues),
+        "memory": tuple(memory_issues),
+        "algorithm": tuple(algo_issues)
+    }
+
+
+def _scan_pool() -> ProcessPoolExecutor:
+    """Return the worker pool for large scans, starting it on first use.
+    
+    Workers come from a fork server rather than forking the server process,
+    which already runs threads by the time the pool starts.
+    """
+    global _SCAN_POOL
+    if _SCAN_POOL is None:
+        _SCAN_POOL = ProcessPoolExecutor(
+            max_workers=_SCAN_WORKERS,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _SCAN_POOL
+
+
+def shutdown_scan_pool():
+    """Stop the worker pool for large scans, if it was started."""
+    global _SCAN_POOL
+    if _SCAN_POOL is not None:
+        _SCAN_POOL.shutdown(cancel_futures=True)
+        _SCAN_POOL = None
+
+
+async def _scan_performance_async(code: str) -> Dict[str, Tuple[Dict[str, Any], ...]]:
+    """Run _scan_performance memoized, and off the event loop for large inputs.
+    
+    The detector tools called on the same code share one scan.
+    
+    Args:
+        code: Code to analyze
+        
+    Returns:
+        Issues found by each detector, as from _scan_performance
+    """
+    cache_key = hashlib.blake2b(code.encode(), digest_size=16).digest()
+    scan = _SCAN_CACHE.get(cache_key)
+    if scan is not None:
+        _SCAN_CACHE.move_to_end(cache_key)
+        return scan
+    
+    if len(code) < _PROCESS_SCAN_MIN_CHARS:
+        scan = _scan_performance(code)
+    else:
+        loop = asyncio.get_running_loop()
+        scan = await loop.run_in_executor(_scan_pool(), _scan_performance, code)
+    
+    _SCAN_CACHE[cache_key] = scan
+    if len(_SCAN_CACHE) > _SCAN_CACHE_SIZE:
+        _SCAN_CACHE.popitem(last=False)
+    return scan
+
 
 class PerformanceAnalysisAgent(BaseCodeAgent):
     """Agent specialized in performance optimization."""
@@ -43,46 +459,8 @@ class PerformanceAnalysisAgent(BaseCodeAgent):
             Returns:
                 List of inefficient loops
             """
-            issues = []
-            lines = code.split('\n')
-            
-            # Patterns for inefficient loops
-            patterns = [
-                (r'for.*in.*range\(len\(', "Using range(len()) instead of enumerate()", "medium"),
-                (r'\.append\(.*\).*for.*in', "List append in loop instead of list comprehension", "low"),
-                (r'for.*in.*\.keys\(\)', "Iterating over .keys() unnecessarily", "low"),
-                (r'for.*in.*\.items\(\).*\[0\]|\[1\]', "Unpacking items inefficiently", "low"),
-                (r'while.*len\(.*\).*>', "Inefficient while loop with len() check", "medium"),
-            ]
-            
-            for line_num, line in enumerate(lines, 1):
-                for pattern, description, severity in patterns:
-                    if re.search(pattern, line):
-                        issues.append({
-                            "line": line_num,
-                            "description": description,
-                            "code": line.strip(),
-                            "severity": severity
-                        })
-            
-            # Check for nested loops (O(n²) or worse)
-            indent_stack = []
-            for line_num, line in enumerate(lines, 1):
-                if 'for ' in line or 'while ' in line:
-                    indent = len(line) - len(line.lstrip())
-                    # Check if this is a nested loop
-                    if indent_stack and indent > indent_stack[-1]:
-                        issues.append({
-                            "line": line_num,
-                            "description": "Nested loop detected - potential O(n²) complexity",
-                            "code": line.strip(),
-                            "severity": "high"
-                        })
-                    indent_stack.append(indent)
-                elif not line.strip():
-                    indent_stack = []
-            
-            return issues
+            scan = await _scan_performance_async(code)
+            return list(scan["loops"])
         
         @self.agent.tool
         async def detect_database_issues(ctx: RunContext[Any], code: str) -> List[Dict[str, Any]]:
@@ -94,51 +472,8 @@ class PerformanceAnalysisAgent(BaseCodeAgent):
             Returns:
                 List of database performance issues
             """
-            issues = []
-            lines = code.split('\n')
-            
-            # N+1 query pattern detection
-            in_loop = False
-            loop_indent = 0
-            
-            for line_num, line in enumerate(lines, 1):
-                current_indent = len(line) - len(line.lstrip())
-                
-                # Check if we're entering a loop
-                if 'for ' in line or 'while ' in line:
-                    in_loop = True
-                    loop_indent = current_indent
-                elif in_loop and current_indent <= loop_indent:
-                    in_loop = False
-                
-                # Check for queries inside loops
-                if in_loop and any(keyword in line for keyword in ['SELECT', 'query', 'execute', 'fetch', 'find', 'get']):
-                    issues.append({
-                        "line": line_num,
-                        "type": "n_plus_one",
-                        "description": "Database query inside loop - potential N+1 problem",
-                        "severity": "high"
-                    })
-                
-                # Check for missing indexes
-                if 'WHERE' in line and not any(idx in line for idx in ['id', 'pk', 'primary']):
-                    issues.append({
-                        "line": line_num,
-                        "type": "missing_index",
-                        "description": "Query without apparent index usage",
-                        "severity": "medium"
-                    })
-                
-                # Check for SELECT *
-                if re.search(r'SELECT\s+\*', line, re.IGNORECASE):
-                    issues.append({
-                        "line": line_num,
-                        "type": "select_all",
-                        "description": "SELECT * can fetch unnecessary data",
-                        "severity": "low"
-                    })
-            
-            return issues
+            scan = await _scan_performance_async(code)
+            return list(scan["database"])
         
         @self.agent.tool
         async def detect_memory_issues(ctx: RunContext[Any], code: str) -> List[Dict[str, Any]]:
@@ -150,45 +485,8 @@ class PerformanceAnalysisAgent(BaseCodeAgent):
             Returns:
                 List of memory-related issues
             """
-            issues = []
-            lines = code.split('\n')
-            
-            for line_num, line in enumerate(lines, 1):
-                # Large data structure creation
-                if re.search(r'=\s*\[\s*\].*for.*in.*range\([0-9]{4,}', line):
-                    issues.append({
-                        "line": line_num,
-                        "description": "Creating large list - consider generator",
-                        "severity": "high"
-                    })
-                
-                # Reading entire file into memory
-                if re.search(r'\.read\(\)|\.readlines\(\)', line):
-                    issues.append({
-                        "line": line_num,
-                        "description": "Reading entire file into memory - consider streaming",
-                        "severity": "medium"
-                    })
-                
-                # String concatenation in loops
-                if '+=' in line and ('"' in line or "'" in line):
-                    # Check if in loop context
-                    if line_num > 1 and any(keyword in lines[line_num-2] for keyword in ['for', 'while']):
-                        issues.append({
-                            "line": line_num,
-                            "description": "String concatenation in loop - use join() or list",
-                            "severity": "medium"
-                        })
-                
-                # Global variables that could be large
-                if re.match(r'^[A-Z_]+\s*=.*\[\]|\{\}', line.strip()):
-                    issues.append({
-                        "line": line_num,
-                        "description": "Global mutable state - potential memory leak",
-                        "severity": "low"
-                    })
-            
-            return issues
+            scan = await _scan_performance_async(code)
+            return list(scan["memory"])
         
         @self.agent.tool
         async def detect_algorithm_issues(ctx: RunContext[Any], code: str) -> List[Dict[str, Any]]:
@@ -200,28 +498,8 @@ class PerformanceAnalysisAgent(BaseCodeAgent):
             Returns:
                 List of algorithmic inefficiencies
             """
-            issues = []
-            lines = code.split('\n')
-            
-            # Check for inefficient operations
-            patterns = [
-                (r'if.*in.*list\(|if.*in.*\[', "Using 'in' with list - O(n) operation", "medium"),
-                (r'\.sort\(\).*\.sort\(\)', "Multiple sorts - combine operations", "medium"),
-                (r'sorted\(.*reverse.*sorted\(', "Multiple sorting operations", "medium"),
-                (r'len\(.*\)\s*==\s*0|len\(.*\)\s*!=\s*0', "Use boolean evaluation instead of len()", "low"),
-                (r'sum\(\[.*for.*in.*\]\)', "sum() with list comprehension - use generator", "low"),
-            ]
-            
-            for line_num, line in enumerate(lines, 1):
-                for pattern, description, severity in patterns:
-                    if re.search(pattern, line):
-                        issues.append({
-                            "line": line_num,
-                            "description": description,
-                            "severity": severity
-                        })
-            
-            return issues
+            scan = await _scan_performance_async(code)
+            return list(scan["algorithm"])
     
     async def _perform_analysis(self, context: CodeContext) -> List[CodeIssue]:
         """Perform performance analysis.
@@ -233,6 +511,41 @@ class PerformanceAnalysisAgent(BaseCodeAgent):
             List of performance issues
         """
         issues = []
+        file_path = context.file_path or "unknown"
+        detected_by = self.name
+        locations = {}
+        # (line, title, description) findings already reported
+        seen = set()
+        
+        def _make_issue(title, description, severity, confidence, line, **fields):
+            """Build a CodeIssue from trusted values, sharing one location per line."""
+            location = locations.get(line)
+            if location is None:
+                location = locations[line] = CodeLocation.model_construct(
+                    file_path=file_path,
+                    line_start=line,
+                    line_end=line
+                )
+            return CodeIssue.model_construct(
+                id=next(_issue_ids),
+                title=title,
+                description=description,
+                severity=_SEVERITY[severity],
+                category=IssueCategory.PERFORMANCE,
+                location=location,
+                confidence=confidence,
+                detected_by=detected_by,
+                tags=issue_tags(title, description),
+                **fields
+            )
+        
+        def _add_issue(title, description, severity, confidence, line, **fields):
+            """Append an issue unless the same finding was already reported for its line."""
+            key = (line, title, description)
+            if key in seen:
+                return
+            seen.add(key)
+            issues.append(_make_issue(title, description, severity, confidence, line, **fields))
         
         # Use Pydantic AI agent to analyze code for performance issues - simplified for speed
         prompt = f"""Analyze this {context.language} code for performance issues:
@@ -250,6 +563,9 @@ ISSUE:
 - Suggestion: [optimization]"""
 
         try:
+            # Wait for the shared rate limit outside the model timeout
+            await self._throttle(prompt)
+            
             # Run agent to get AI analysis with timeout
             result = await asyncio.wait_for(
                 self.agent.run(prompt),
@@ -278,7 +594,7 @@ ISSUE:
                 for line in block.split('\n'):
                     line = line.strip()
                     if line.startswith('- Line:'):
-                        line_match = re.search(r'Line:\s*(\d+)', line)
+                        line_match = _LINE_FIELD_RE.search(line)
                         if line_match:
                             line_num = int(line_match.group(1))
                     elif line.startswith('- Type:'):
@@ -297,7 +613,7 @@ ISSUE:
                 # If we couldn't parse line number, try alternative formats
                 if not line_num:
                     # Try to find line number in the whole block
-                    line_match = re.search(r'(?:Line|line)[\s:]+(\d+)', block, re.IGNORECASE)
+                    line_match = _LINE_ANYWHERE_RE.search(block)
                     if line_match:
                         line_num = int(line_match.group(1))
                     else:
@@ -309,23 +625,17 @@ ISSUE:
                     code_snippet = lines[line_num - 1].strip()
                 
                 # Create issue with all extracted information
-                issues.append(CodeIssue(
-                    id=str(uuid.uuid4()),
-                    title=issue_type,
-                    description=description or f"Performance issue detected at line {line_num}",
-                    severity=SeverityLevel(severity),
-                    category=IssueCategory.PERFORMANCE,
-                    location=CodeLocation(
-                        file_path=context.file_path or "unknown",
-                        line_start=line_num,
-                        line_end=line_num
-                    ),
+                description = description or f"Performance issue detected at line {line_num}"
+                _add_issue(
+                    issue_type,
+                    description,
+                    severity,
+                    0.9,
+                    line_num,
                     code_snippet=code_snippet,
                     suggested_fix=fixed_code if fixed_code else None,
-                    fix_explanation=suggestion if suggestion else None,
-                    confidence=0.9,
-                    detected_by=self.name
-                ))
+                    fix_explanation=suggestion if suggestion else None
+                )
             
             # If AI found issues, return them
             if issues:
@@ -334,65 +644,8 @@ ISSUE:
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"AI analysis failed: {e}, using fallback")
-        
-        # Minimal fallback only if AI completely fails
-        return issues
-        
-        # Detect memory issues directly
-        memory_issues = []
-        for line_num, line in enumerate(lines, 1):
-            if re.search(r'\.read\(\)|\.readlines\(\)', line):
-                memory_issues.append({
-                    "line": line_num,
-                    "description": "Reading entire file into memory - consider streaming",
-                    "severity": "medium"
-                })
-        for issue in memory_issues:
-            issues.append(CodeIssue(
-                id=str(uuid.uuid4()),
-                title="Memory Efficiency Issue",
-                description=issue["description"],
-                severity=SeverityLevel(issue["severity"]),
-                category=IssueCategory.PERFORMANCE,
-                location=CodeLocation(
-                    file_path=context.file_path or "unknown",
-                    line_start=issue["line"],
-                    line_end=issue["line"]
-                ),
-                confidence=0.7,
-                detected_by=self.name
-            ))
-        
-        # Detect algorithm issues directly
-        algo_issues = []
-        algo_patterns = [
-            (r'if.*in.*list\(|if.*in.*\[', "Using 'in' with list - O(n) operation", "medium"),
-            (r'len\(.*\)\s*==\s*0|len\(.*\)\s*!=\s*0', "Use boolean evaluation instead of len()", "low"),
-        ]
-        
-        for line_num, line in enumerate(lines, 1):
-            for pattern, description, severity in algo_patterns:
-                if re.search(pattern, line):
-                    algo_issues.append({
-                        "line": line_num,
-                        "description": description,
-                        "severity": severity
-                    })
-        for issue in algo_issues:
-            issues.append(CodeIssue(
-                id=str(uuid.uuid4()),
-                title="Inefficient Algorithm",
-                description=issue["description"],
-                severity=SeverityLevel(issue["severity"]),
-                category=IssueCategory.PERFORMANCE,
-                location=CodeLocation(
-                    file_path=context.file_path or "unknown",
-                    line_start=issue["line"],
-                    line_end=issue["line"]
-                ),
-                confidence=0.85,
-                detected_by=self.name
-            ))
+            logger.error(f"AI analysis failed: {e}")
+            # Report the model failure instead of an empty, clean-looking result
+            raise
         
         return issues
\ No newline at end of file
@@ -1,13 +1,12 @@
 """Security vulnerability detection agent using Pydantic AI."""
 
 import re
-import uuid
 import asyncio
 from typing import List, Dict, Any
 
 from pydantic_ai import RunContext
 
-from .base_agent import BaseCodeAgent
+from .base_agent import BaseCodeAgent, issue_ids, issue_tags
 from .models import (
     CodeContext,
     CodeIssue,
@@ -16,6 +15,9 @@ from .models import (
     IssueCategory
 )
 
+# Issue ids for every analysis, drawing randomness in shared batches
+_issue_ids = issue_ids()
+
 
 class SecurityAnalysisAgent(BaseCodeAgent):
     """Agent specialized in security vulnerability detection."""
@@ -213,6 +215,9 @@ ISSUE:
 - Suggestion: [fix]"""
 
         try:
+            # Wait for the shared rate limit outside the model timeout
+            await self._throttle(prompt)
+            
             # Run agent to get AI analysis with timeout
             result = await asyncio.wait_for(
                 self.agent.run(prompt),
@@ -272,10 +277,11 @@ ISSUE:
                     code_snippet = lines[line_num - 1].strip()
                 
                 # Create issue with all extracted information
+                description = description or f"Security issue detected at line {line_num}"
                 issues.append(CodeIssue(
-                    id=str(uuid.uuid4()),
+                    id=next(_issue_ids),
                     title=issue_type,
-                    description=description or f"Security issue detected at line {line_num}",
+                    description=description,
                     severity=SeverityLevel(severity),
                     category=IssueCategory.SECURITY,
                     location=CodeLocation(
@@ -287,7 +293,8 @@ ISSUE:
                     suggested_fix=fixed_code if fixed_code else None,
                     fix_explanation=suggestion if suggestion else None,
                     confidence=0.9,
-                    detected_by=self.name
+                    detected_by=self.name,
+                    tags=issue_tags(issue_type, description)
                 ))
             
             # If AI found issues, return them
@@ -297,6 +304,8 @@ ISSUE:
         except Exception as e:
             import logging
             logger = logging.getLogger(__name__)
-            logger.error(f"AI analysis failed: {e}, using fallback")
+            logger.error(f"AI analysis failed: {e}")
+            # Report the model failure instead of an empty, clean-looking result
+            raise
         
         return issues
\ No newline at end of file
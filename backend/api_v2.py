@@ -5,7 +5,7 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 import json
 
@@ -15,6 +15,7 @@ from agents_v2 import (
     CodeRecommendation,
     AnalysisResult
 )
+from agents_v2.orchestrator import encode_event
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,13 @@ class AnalyzeRequest(BaseModel):
     project_context: Optional[Dict[str, Any]] = None
 
 
+class AnalyzeResponse(BaseModel):
+    """Response for code analysis."""
+    status: str
+    analysis: AnalysisResult
+    timestamp: str
+
+
 class StreamingAnalysisResponse(BaseModel):
     """Streaming analysis response."""
     type: str
@@ -104,10 +112,12 @@ class ConnectionManager:
     async def broadcast_analysis_update(self, analysis_id: str, update: Dict[str, Any]):
         """Broadcast analysis update to subscribers."""
         if analysis_id in self.analysis_subscribers:
+            # Encode once for every subscriber; splices a pre-encoded result in as "result"
+            message = encode_event(update).decode()
             disconnected = []
             for websocket in self.analysis_subscribers[analysis_id]:
                 try:
-                    await websocket.send_json(update)
+                    await websocket.send_text(message)
                 except:
                     disconnected.append(websocket)
             
@@ -119,10 +129,9 @@ class ConnectionManager:
 # Global connection manager
 manager = ConnectionManager()
 
-
 # API Endpoints
 
-@router.post("/analyze", response_model=Dict[str, Any])
+@router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_code(request: AnalyzeRequest, background_tasks: BackgroundTasks):
     """Analyze code with Pydantic AI agents.
     
@@ -148,11 +157,14 @@ async def analyze_code(request: AnalyzeRequest, background_tasks: BackgroundTask
         # Run analysis
         result = await orchestrator.analyze_code(context, request.include_recommendations)
         
-        return {
-            "status": "success",
-            "analysis": result.dict(),
-            "timestamp": datetime.now().isoformat()
-        }
+        # Serialize with Pydantic's compiled JSON encoder instead of
+        # dumping to a dict and re-encoding it through FastAPI
+        response = AnalyzeResponse(
+            status="success",
+            analysis=result,
+            timestamp=datetime.now().isoformat()
+        )
+        return Response(content=response.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
@@ -317,7 +329,7 @@ async def validate_code(request: ValidationRequest):
         # Validate code
         if request.session_id:
             # Validate session code
-            validation = await editor_agent.agent.tools.validate_session_code(request.session_id)
+            validation = await editor_agent.validate_session(request.session_id)
         else:
             # Validate provided code directly
             # Create temporary session for validation
@@ -326,11 +338,10 @@ async def validate_code(request: ValidationRequest):
                 language=request.language
             )
             temp_session_id = await editor_agent.create_session(context)
-            validation = await editor_agent.agent.tools.validate_session_code(temp_session_id)
+            validation = await editor_agent.validate_session(temp_session_id)
             
             # Clean up temporary session
-            if temp_session_id in editor_agent.active_sessions:
-                del editor_agent.active_sessions[temp_session_id]
+            editor_agent.active_sessions.pop(temp_session_id, None)
         
         return {
             "status": "success",
@@ -408,10 +419,8 @@ async def websocket_analysis(websocket: WebSocket):
                 # Stream analysis results
                 try:
                     async for update in orchestrator.analyze_code_streaming(context, True):
-                        await websocket.send_json({
-                            "type": "analysis_update",
-                            "update": update
-                        })
+                        message = b'{"type":"analysis_update","update":' + encode_event(update) + b'}'
+                        await websocket.send_text(message.decode())
                         
                 except Exception as e:
                     await websocket.send_json({
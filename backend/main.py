@@ -69,16 +69,22 @@ if api_key and api_key not in ["your-api-key-here", "demo-mode"]:
         azure_endpoint=azure_endpoint,
         api_version=api_version
     )
+    # Shared connection pool so all Pydantic AI agents reuse keep-alive connections
+    shared_http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
     # Async client for Pydantic AI agents
     async_azure_client = AsyncAzureOpenAI(
         api_key=api_key,
         azure_endpoint=azure_endpoint,
-        api_version=api_version
+        api_version=api_version,
+        http_client=shared_http_client
     )
     logger.info(f"Azure OpenAI clients initialized - Endpoint: {azure_endpoint}, Model: {os.getenv('REASONING_MODEL')}")
 else:
     azure_client = None
     async_azure_client = None
+    shared_http_client = None
     logger.info("Running in demo mode - using mock responses")
 
 # Initialize AI agents (delayed to avoid startup blocking)
@@ -104,7 +110,7 @@ def get_pydantic_orchestrator():
     global pydantic_orchestrator
     if PYDANTIC_AI_AVAILABLE and pydantic_orchestrator is None:
         pydantic_orchestrator = PydanticAgentOrchestrator(
-            azure_client=azure_client,
+            async_azure_client=async_azure_client,
             model_name=os.getenv("REASONING_MODEL")
         )
         # Set the orchestrator for API v2
@@ -115,11 +121,12 @@ def get_pydantic_orchestrator():
 def get_code_fixer():
     """Get code fixer, creating it if needed."""
     global code_fixer
-    if code_fixer is None and azure_client is not None:
+    if code_fixer is None and async_azure_client is not None:
         # Use Pydantic AI fix agent (agents_v2)
-        from agents_v2 import CodeFixAgent
-        code_fixer = CodeFixAgent(
-            azure_client=azure_client,
+        from agents_v2 import CodeFixAgent, get_agent
+        code_fixer = get_agent(
+            CodeFixAgent,
+            async_azure_client=async_azure_client,
             model_name=os.getenv("REASONING_MODEL")
         )
         logger.info("Pydantic AI fix agent initialized")
@@ -300,9 +307,18 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Disconnect from database."""
+    """Disconnect from database, close shared HTTP connections and stop scan workers."""
     await database.disconnect()
     logger.info("Database disconnected")
+    
+    if shared_http_client is not None:
+        await shared_http_client.aclose()
+        logger.info("Shared HTTP connection pool closed")
+    
+    if PYDANTIC_AI_AVAILABLE:
+        from agents_v2.performance_agent import shutdown_scan_pool
+        shutdown_scan_pool()
+        logger.info("Performance scan worker pool stopped")
 
 # Legacy models for backward compatibility
 class CodeReviewRequest(CodeSubmissionCreate):
@@ -1382,7 +1398,8 @@ async def fix_issue(issue_id: int, request: FixIssueRequest, db: Session = Depen
             original_code=issue.code_snippet or "",
             suggested_code=issue.suggested_fix or "",
             confidence=0.8,
-            impact="Fixes: " + issue.title
+            impact="Fixes: " + issue.title,
+            line_start=issue.line_number
         )
         
         # Apply the fix
@@ -60,6 +60,7 @@ interface AnalysisUpdate {
   result?: AnalysisResult
   progress?: number
   error?: string
+  errors?: Record<string, string>
 }
 
 interface AgentCodeEditorProps {
@@ -78,6 +79,7 @@ export default function AgentCodeEditor({
   const [analysisResult, setAnalysisResult] = useState<AnalysisResult | null>(null)
   const [analysisUpdates, setAnalysisUpdates] = useState<AnalysisUpdate[]>([])
   const [recommendations, setRecommendations] = useState<CodeRecommendation[]>([])
+  const [analysisErrors, setAnalysisErrors] = useState<Record<string, string> | null>(null)
   const [selectedRecommendations, setSelectedRecommendations] = useState<Set<string>>(new Set())
   const [isApplyingFixes, setIsApplyingFixes] = useState(false)
   const [connectionStatus, setConnectionStatus] = useState<'disconnected' | 'connecting' | 'connected'>('disconnected')
@@ -159,6 +161,9 @@ export default function AgentCodeEditor({
         setAnalysisResult(update.result)
         setRecommendations(update.result.recommendations || [])
         setIsAnalyzing(false)
+      } else if (update.type === 'analysis_failed') {
+        setAnalysisErrors(update.errors || {})
+        setIsAnalyzing(false)
       }
     } else if (data.type === 'error') {
       console.error('Analysis error:', data.message)
@@ -179,6 +184,7 @@ export default function AgentCodeEditor({
         setAnalysisResult(null)
         setAnalysisUpdates([])
         setRecommendations([])
+        setAnalysisErrors(null)
         
         const response = await fetch('/api/v2/analyze', {
           method: 'POST',
@@ -212,6 +218,7 @@ export default function AgentCodeEditor({
       setAnalysisResult(null)
       setAnalysisUpdates([])
       setRecommendations([])
+      setAnalysisErrors(null)
       
       wsRef.current.send(JSON.stringify({
         type: 'start_analysis',
@@ -425,6 +432,17 @@ export default function AgentCodeEditor({
                 </div>
               )}
 
+              {analysisErrors && !isAnalyzing && (
+                <Alert variant="danger">
+                  <strong>Analysis Failed</strong>
+                  {Object.entries(analysisErrors).map(([agent, error]) => (
+                    <div key={agent} className="small">
+                      {agent}: {error}
+                    </div>
+                  ))}
+                </Alert>
+              )}
+
               {analysisResult && !isAnalyzing && (
                 <>
                   {/* Summary */}